@@ -22,6 +22,12 @@ import re
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+# Optional: embed libgit2 to read staged diffs without forking git
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
 
 # File pattern to category mapping
 FILE_PATTERNS = {
@@ -124,6 +130,66 @@ SOURCE_EXTENSIONS = [
 ]
 
 
+# Staged diff cache: file path -> diff text (populated once via pygit2)
+_STAGED_DIFFS = None
+
+
+def open_repository():
+    """Open the current repository with pygit2; None if unavailable."""
+    if pygit2 is None:
+        return None
+    try:
+        repo_path = pygit2.discover_repository(os.getcwd())
+        if not repo_path:
+            return None
+        return pygit2.Repository(repo_path)
+    except Exception:
+        return None
+
+
+def get_all_file_diffs() -> Dict[str, str]:
+    """
+    Get staged diffs of all files in one pass (index vs HEAD).
+
+    Uses pygit2 when available and caches the result per process.
+    Returns an empty dict when pygit2 is missing or the repository
+    cannot be read, so callers fall back to ``git diff --cached``.
+    """
+    global _STAGED_DIFFS
+    if _STAGED_DIFFS is not None:
+        return _STAGED_DIFFS
+
+    diffs = {}
+    repo = open_repository()
+    if repo is not None and not repo.head_is_unborn:
+        try:
+            for patch in repo.diff('HEAD', cached=True):
+                diffs[patch.delta.new_file.path] = patch.text or ''
+        except Exception:
+            diffs = {}
+
+    _STAGED_DIFFS = diffs
+    return diffs
+
+
+def get_staged_diff(filepath: str) -> str:
+    """Get staged diff of a file, from the pygit2 cache or git diff --cached."""
+    diffs = get_all_file_diffs()
+    if filepath in diffs:
+        return diffs[filepath]
+
+    try:
+        result = subprocess.run(
+            ['git', 'diff', '--cached', filepath],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return result.stdout
+    except subprocess.CalledProcessError:
+        return ""
+
+
 def get_staged_files() -> List[str]:
     """Get list of staged files using git diff --cached --name-only."""
     result = subprocess.run(
@@ -177,13 +243,7 @@ def detect_code_change_type(filepath: str) -> str:
     This analyzes the git diff content.
     """
     try:
-        result = subprocess.run(
-            ['git', 'diff', '--cached', filepath],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        diff_content = result.stdout
+        diff_content = get_staged_diff(filepath)
 
         # Check for new function definitions (strong indicator of new feature)
         # Match patterns like: +def function_name(
@@ -21,6 +21,8 @@ import re
 import argparse
 from typing import List, Dict
 
+from categorize_changes import get_staged_diff
+
 
 # Category to commit type mapping (小写英文)
 CATEGORY_TO_TYPE = {
@@ -239,16 +241,7 @@ MESSAGE_TEMPLATES = {
 
 def get_file_changes(filepath: str) -> str:
     """Get git diff for a specific file."""
-    try:
-        result = subprocess.run(
-            ['git', 'diff', '--cached', filepath],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
-    except subprocess.CalledProcessError:
-        return ""
+    return get_staged_diff(filepath)
 
 
 def analyze_changes(files: List[str], category: str) -> str:
@@ -385,16 +378,7 @@ def generate_commit_message(category: str, files: List[str]) -> str:
 
 def get_file_diff(filepath: str) -> str:
     """Get git diff for a specific file."""
-    try:
-        result = subprocess.run(
-            ['git', 'diff', '--cached', filepath],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
-    except subprocess.CalledProcessError:
-        return ""
+    return get_staged_diff(filepath)
 
 
 def analyze_diff_content(diff: str, filename: str) -> str:
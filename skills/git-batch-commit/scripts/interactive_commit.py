@@ -51,7 +51,11 @@ def unstage_files(files: List[str]) -> bool:
 
 
 def create_commit(message: str) -> bool:
-    """Create a git commit with the given message (supports multi-line)."""
+    """Create a git commit with the given message (supports multi-line).
+
+    Always goes through ``git commit`` so hooks, commit signing and message
+    cleanup behave exactly as in a normal commit.
+    """
     try:
         # Use -m multiple times for multi-line commit message
         # First line is the subject, subsequent lines are the body
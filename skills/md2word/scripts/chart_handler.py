@@ -7,10 +7,11 @@
 
 import os
 import re
+import json
+import hashlib
 import subprocess
 import shutil
 import time
-from PIL import Image
 
 # 导入配置模块
 from config import get_config
@@ -19,43 +20,218 @@ from config import get_config
 # from md2word import insert_image_to_word
 
 
-def preprocess_mermaid_code(mermaid_code: str) -> str:
-    """预处理Mermaid源码，避免Mermaid v11 对标签内Markdown解析导致的错误"""
-    s = mermaid_code
+# 饼图数据项："标签" : 数值
+PIE_ITEM_RE = re.compile(r'"([^"]+)"\s*:\s*(\d+(?:\.\d+)?)')
+
+
+# Mermaid 源码预处理：反引号、节点标签内列表、行首列表合并为一个正则，单次扫描完成替换
+MERMAID_FIX_RE = re.compile(
+    r'(?P<tick>`)'
+    # 节点标签内部（[ ( { > 之后）：有序列表 1. / 无序列表 - *
+    r'|(?P<brace>[\[({>])(?P<quote>"?\s*)(?:(?P<num>\d+)\.|[-*])\s'
+    # 兜底：整行以列表开头
+    r'|^(?P<indent>\s*)(?:[-*]|(?P<lnum>\d+)\.)\s+',
+    re.MULTILINE
+)
 
-    # 反引号替换，避免 codespan 被解析
-    s = s.replace("`", "'")
 
-    # 1) 针对节点标签内部：有序列表 1. -> 1:
-    def _repl_number_dot(m: re.Match) -> str:
-        brace = m.group('brace')
-        quote = m.group('quote') or ''
+def _repl_mermaid_fix(m: re.Match) -> str:
+    if m.group('tick'):
+        return "'"
+    brace = m.group('brace')
+    if brace is not None:
+        prefix = brace + m.group('quote')
         num = m.group('num')
-        return f"{brace}{quote}{num}: "
+    else:
+        prefix = m.group('indent')
+        num = m.group('lnum')
+    return f"{prefix}{num}: " if num is not None else f"{prefix}• "
+
+
+def preprocess_mermaid_code(mermaid_code: str) -> str:
+    """预处理Mermaid源码，避免Mermaid v11 对标签内Markdown解析导致的错误
+
+    - 反引号替换为单引号，避免 codespan 被解析
+    - 节点标签内部：有序列表 1. -> 1:，无序列表 - / * -> •
+    - 兜底：整行以列表开头的情况（极少出现在Mermaid内，但保留以防万一）
+    """
+    return MERMAID_FIX_RE.sub(_repl_mermaid_fix, mermaid_code)
+
+
+def find_mmdc() -> str:
+    """查找 mmdc 命令：优先环境变量 MMDCCMD，其次脚本同目录 node_modules，再其次系统 PATH"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    mmdc_env = os.environ.get('MMDCCMD', '').strip()
+    mmdc_path = mmdc_env if mmdc_env else os.path.join(script_dir, "node_modules", ".bin", "mmdc")
+    if not os.path.exists(mmdc_path):
+        mmdc_path = shutil.which("mmdc") or ""
+    return mmdc_path
+
+
+def build_mmdc_command(mmdc_path, input_path, output_path, extra_args=None):
+    """构建生成高分辨率PNG图片的 mmdc 命令"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    abs_in = os.path.abspath(input_path)
+    abs_out = os.path.abspath(output_path)
+    cfg = os.path.join(script_dir, "mermaid-config.json")
+    cmd = [mmdc_path, "-i", abs_in, "-o", abs_out, "-t", "neutral", "-w", "2200", "-H", "1500", "--scale", "2.0"]
+    if extra_args:
+        cmd.extend(extra_args)
+    if os.path.exists(cfg):
+        cmd.extend(["-c", cfg])
+    return cmd
+
+
+# ============================================================================
+# 渲染结果缓存：按预处理后源码的哈希复用已生成的 PNG
+# ============================================================================
+
+MERMAID_CACHE_FILE = 'mermaid-cache.json'
+
+# 源码哈希（blake2b 16 字节）-> PNG 路径
+_MERMAID_CACHE = {}
+# 已加载过的缓存文件路径
+_LOADED_CACHE_FILES = set()
+
+
+def mermaid_cache_key(mermaid_code: str) -> bytes:
+    """计算预处理后 Mermaid 源码的缓存键"""
+    return hashlib.blake2b(mermaid_code.encode('utf-8'), digest_size=16).digest()
+
+
+def load_mermaid_cache(get_image_path_func, md_file_path):
+    """加载图片目录下的缓存文件（{哈希: PNG 文件名}），每个文件只加载一次"""
+    cache_path = get_image_path_func(md_file_path, MERMAID_CACHE_FILE)
+    if not cache_path or cache_path in _LOADED_CACHE_FILES:
+        return
+    _LOADED_CACHE_FILES.add(cache_path)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return
+    image_dir = os.path.dirname(cache_path)
+    for hex_key, png_name in entries.items():
+        try:
+            _MERMAID_CACHE.setdefault(bytes.fromhex(hex_key), os.path.join(image_dir, png_name))
+        except ValueError:
+            continue
+
+
+def get_cached_mermaid_png(mermaid_code: str):
+    """查找已渲染的 PNG，文件已被删除时返回 None"""
+    png_path = _MERMAID_CACHE.get(mermaid_cache_key(mermaid_code))
+    if png_path and os.path.exists(png_path):
+        return png_path
+    return None
+
+
+def remember_mermaid_png(mermaid_code: str, png_path: str):
+    """记录渲染结果，并写入 PNG 所在目录的缓存文件以便下次运行复用"""
+    key = mermaid_cache_key(mermaid_code)
+    _MERMAID_CACHE[key] = png_path
+    cache_path = os.path.join(os.path.dirname(png_path), MERMAID_CACHE_FILE)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        entries = {}
+    entries[key.hex()] = os.path.basename(png_path)
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️ 写入Mermaid缓存失败: {e}")
+
 
-    s = re.sub(r"(?m)(?P<brace>[\[\({\>])(?P<quote>\"?\s*)(?P<num>\d+)\.\s", _repl_number_dot, s)
+def prerender_mermaid_charts(mermaid_codes, get_image_path_func, md_file_path):
+    """一次 mmdc 调用批量渲染文档中的全部 Mermaid 图表
 
-    # 2) 针对节点标签内部：无序列表 - / * -> •
-    def _repl_bullet(m: re.Match) -> str:
-        brace = m.group('brace')
-        quote = m.group('quote') or ''
-        return f"{brace}{quote}• "
+    mmdc 以 Markdown 为输入时会在同一个 Chromium 实例中渲染所有 mermaid 代码块，
+    输出为 <输出名>-1.png、<输出名>-2.png……，避免每个图表都冷启动一次 Chromium。
+    已有缓存的图表不再重复渲染。
 
-    s = re.sub(r"(?m)(?P<brace>[\[\({\>])(?P<quote>\"?\s*)[-*]\s", _repl_bullet, s)
+    Args:
+        mermaid_codes: Mermaid源码列表（未预处理）
+        get_image_path_func: 获取图片输出路径的函数
+        md_file_path: Markdown文件路径
 
-    # 3) 兜底：整行以列表开头的情况（极少出现在Mermaid内，但保留以防万一）
-    s = re.sub(r"(?m)^(\s*)-\s+", r"\1• ", s)
-    s = re.sub(r"(?m)^(\s*)\*\s+", r"\1• ", s)
-    s = re.sub(r"(?m)^(\s*)(\d+)\.\s+", r"\1\2: ", s)
+    Returns:
+        预处理后的源码 -> PNG 路径 的映射；未包含的图表由逐个渲染兜底
+    """
+    # 按预处理后的源码去重，保持首次出现顺序
+    codes = list(dict.fromkeys(preprocess_mermaid_code(code) for code in mermaid_codes))
+    if len(codes) < 2:
+        return {}
+
+    load_mermaid_cache(get_image_path_func, md_file_path)
+    rendered = {}
+    pending = []
+    for code in codes:
+        png_path = get_cached_mermaid_png(code)
+        if png_path:
+            rendered[code] = png_path
+        else:
+            pending.append(code)
+    if len(pending) < 2:
+        return rendered
+
+    # 只有渲染需要 mmdc，缓存命中的图表不受影响
+    mmdc_path = find_mmdc()
+    if not mmdc_path:
+        return rendered
 
-    return s
+    timestamp = str(int(time.time() * 1000))
+    batch_md_path = get_image_path_func(md_file_path, f"mermaid-batch-{timestamp}.md")
+    if not batch_md_path:
+        return rendered
+    batch_out_path = batch_md_path[:-3] + "-out.md"
+    batch_base = batch_out_path[:-3]
+
+    try:
+        print(f"🖥️ 批量渲染 {len(pending)} 个Mermaid图表...")
+        with open(batch_md_path, 'w', encoding='utf-8') as f:
+            for code in pending:
+                f.write(f"```mermaid\n{code}\n```\n\n")
+
+        cmd = build_mmdc_command(mmdc_path, batch_md_path, batch_out_path, ["-e", "png"])
+        print(f"🔧 执行命令: {' '.join(cmd)}")
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30 * len(pending))
+        if result.returncode != 0:
+            print(f"⚠️ mmdc 批量渲染失败，改为逐个渲染: {result.stderr}")
+            return rendered
+
+        artefacts = [f"{batch_base}-{index}.png" for index in range(1, len(pending) + 1)]
+        if not all(os.path.exists(artefact) for artefact in artefacts):
+            print("⚠️ 批量渲染输出不完整，改为逐个渲染")
+            return rendered
+        for index, (code, artefact) in enumerate(zip(pending, artefacts), 1):
+            png_path = os.path.join(os.path.dirname(batch_md_path), f"mermaid-chart-{timestamp}-{index}.png")
+            os.replace(artefact, png_path)
+            remember_mermaid_png(code, png_path)
+            rendered[code] = png_path
+        return rendered
+
+    except subprocess.TimeoutExpired:
+        print("⚠️ mmdc 批量渲染超时，改为逐个渲染")
+        return rendered
+    except Exception as e:
+        print(f"⚠️ 批量渲染失败，改为逐个渲染: {e}")
+        return rendered
+    finally:
+        for path in (batch_md_path, batch_out_path):
+            if os.path.exists(path):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
 
 
 def try_local_mermaid_render(insert_image_func, get_image_path_func, mermaid_code, md_file_path):
     """尝试使用本地mermaid-cli渲染图表
 
     Args:
-        insert_image_func: 插入图片到Word的函数
+        insert_image_func: 插入图片文件到Word的函数（参数为PNG路径）
         get_image_path_func: 获取图片输出路径的函数
         mermaid_code: Mermaid源码
         md_file_path: Markdown文件路径
@@ -83,22 +259,13 @@ def try_local_mermaid_render(insert_image_func, get_image_path_func, mermaid_cod
         with open(temp_mmd_path, 'w', encoding='utf-8') as f:
             f.write(mermaid_code)
 
-        # 检查 mmdc 命令：优先环境变量 MMDCCMD，其次脚本同目录 node_modules，再其次系统 PATH
-        mmdc_env = os.environ.get('MMDCCMD', '').strip()
-        mmdc_path = mmdc_env if mmdc_env else os.path.join(script_dir, "node_modules", ".bin", "mmdc")
-        if not os.path.exists(mmdc_path):
-            mmdc_path = shutil.which("mmdc") or ""
+        mmdc_path = find_mmdc()
         if not mmdc_path:
             print("⚠️ 本地 mmdc 命令未找到（已跳过本地渲染）")
             return False
 
         # 使用mmdc命令生成高分辨率PNG图片
-        abs_in = os.path.abspath(temp_mmd_path)
-        abs_out = os.path.abspath(output_png_path)
-        cfg = os.path.join(script_dir, "mermaid-config.json")
-        cmd = [mmdc_path, "-i", abs_in, "-o", abs_out, "-t", "neutral", "-w", "2200", "-H", "1500", "--scale", "2.0"]
-        if os.path.exists(cfg):
-            cmd.extend(["-c", cfg])
+        cmd = build_mmdc_command(mmdc_path, temp_mmd_path, output_png_path)
 
         print(f"🔧 执行命令: {' '.join(cmd)}")
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
@@ -112,9 +279,10 @@ def try_local_mermaid_render(insert_image_func, get_image_path_func, mermaid_cod
             print("⚠️ PNG文件未生成")
             return False
 
-        # 加载图片并插入Word
-        image = Image.open(output_png_path)
-        insert_image_func(image)
+        remember_mermaid_png(mermaid_code, output_png_path)
+
+        # 插入Word（尺寸合适时直接嵌入PNG文件，无需重新编码）
+        insert_image_func(output_png_path)
 
         print(f"✅ 本地Mermaid图表渲染成功！图片已保存至: {os.path.relpath(output_png_path)}")
         return True
@@ -173,7 +341,7 @@ def create_simple_pie_text(add_paragraph_func, set_format_func, mermaid_code):
     for line in lines:
         if ':' in line and '"' in line:
             # 解析数据项
-            match = re.search(r'"([^"]+)"\s*:\s*(\d+(?:\.\d+)?)', line)
+            match = PIE_ITEM_RE.search(line)
             if match:
                 label, value = match.groups()
                 p.add_run(f"\n• {label}: {value}")
@@ -222,22 +390,34 @@ def create_fallback_text(add_paragraph_func, set_format_func, mermaid_code):
         set_format_func(p)
 
 
-def create_mermaid_chart(doc, insert_image_func, get_image_path_func, add_paragraph_func, set_format_func, mermaid_code, md_file_path):
+def create_mermaid_chart(doc, insert_image_func, get_image_path_func, add_paragraph_func, set_format_func, mermaid_code, md_file_path, prerendered=None):
     """将Mermaid图表转换为图片并插入Word文档（本地渲染优先）
 
     Args:
         doc: Word文档对象
-        insert_image_func: 插入图片的函数
+        insert_image_func: 插入图片文件的函数（参数为PNG路径）
         get_image_path_func: 获取图片路径的函数
         add_paragraph_func: 添加段落的函数
         set_format_func: 设置段落格式的函数
         mermaid_code: Mermaid源码
         md_file_path: Markdown文件路径
+        prerendered: prerender_mermaid_charts 的批量渲染结果（可选）
     """
 
     # 预处理，规避 Mermaid 11 对列表/反引号的 Markdown 解析造成的报错
     mermaid_code = preprocess_mermaid_code(mermaid_code)
 
+    # 已批量渲染或已有缓存：直接插入，不再调用 mmdc
+    # 缓存命中不需要 mmdc，未安装 mermaid-cli 时也复用已有图片
+    png_path = prerendered.get(mermaid_code) if prerendered else None
+    if not png_path:
+        load_mermaid_cache(get_image_path_func, md_file_path)
+        png_path = get_cached_mermaid_png(mermaid_code)
+    if png_path and os.path.exists(png_path):
+        insert_image_func(png_path)
+        print(f"✅ 本地Mermaid图表渲染成功！图片已保存至: {os.path.relpath(png_path)}")
+        return
+
     # 首先尝试本地渲染
     local_success = try_local_mermaid_render(insert_image_func, get_image_path_func, mermaid_code, md_file_path)
     if local_success:
@@ -13,25 +13,38 @@ if TYPE_CHECKING:
     from typing import Callable
 
 
+# 配置路径不存在的标记（区别于值为 None）
+_MISSING = object()
+
+
 class Config:
     """配置数据结构"""
 
     def __init__(self, config_dict: Dict[str, Any]):
         """初始化配置"""
         self._config = config_dict
+        # 点分隔路径 -> 解析结果；配置创建后不再修改，缓存无需失效
+        self._lookup_cache: Dict[str, Any] = {}
 
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置值，支持点分隔的路径（如 'page.width'）"""
-        keys = key.split('.')
+        value = self._lookup_cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._resolve(key)
+            self._lookup_cache[key] = value
+        return default if value is None else value
+
+    def _resolve(self, key: str) -> Any:
+        """逐级解析点分隔路径，路径不存在时返回 None"""
         value = self._config
-        for k in keys:
+        for k in key.split('.'):
             if isinstance(value, dict):
                 value = value.get(k)
                 if value is None:
-                    return default
+                    return None
             else:
-                return default
-        return value if value is not None else default
+                return None
+        return value
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -6,13 +6,55 @@
 """
 
 import re
+from collections import namedtuple
+from copy import deepcopy
+from functools import lru_cache
 from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.oxml.ns import qn
+from docx.oxml.shared import OxmlElement
+from docx.text.parfmt import ParagraphFormat
 
 # 导入配置模块
 from config import Config, get_config
 
+# 所有行内格式标记（** * __ _ <u> ~~ ` $）都至少包含其中一个字符
+FORMAT_MARKER_RE = re.compile(r'[*_<~`$]')
+
+# 行内格式模式（正文与表格单元格共用），模块加载时编译一次
+INLINE_FORMAT_PATTERNS = [
+    (re.compile(r'\*\*\*(.*?)\*\*\*'), {'bold': True, 'italic': True}),
+    (re.compile(r'___(.*?)___'), {'bold': True, 'italic': True}),
+    (re.compile(r'\*\*(.*?)\*\*'), {'bold': True}),
+    (re.compile(r'__(.*?)__'), {'bold': True}),
+    (re.compile(r'(?<!\*)\*([^*\n]+?)\*(?!\*)'), {'italic': True}),
+    (re.compile(r'(?<!_)_([^_\n]+?)_(?!_)'), {'italic': True}),
+    (re.compile(r'<u>(.*?)</u>'), {'underline': True}),
+    (re.compile(r'~~(.*?)~~'), {'strikethrough': True}),
+    (re.compile(r'`([^`\n]+)`'), {'code': True}),
+    (re.compile(r'\$([^$\n]+?)\$'), {'math': True}),  # LaTeX数学公式支持
+]
+
+# 全部行内格式模式的交替正则：一次扫描判断文本中是否存在任何格式
+INLINE_FORMAT_ANY_RE = re.compile('|'.join(f'(?:{pattern.pattern})' for pattern, _ in INLINE_FORMAT_PATTERNS))
+
+# <br> 段内换行标签
+BR_TAG_RE = re.compile(r'<br\s*/?>', re.IGNORECASE)
+
+
+# 默认文字颜色（RGBColor 不可变，可在各 run 间共享）
+BLACK = RGBColor(0, 0, 0)
+
+# rFonts 属性名（qn 结果不变，避免每个 run 重复解析命名空间前缀）
+QN_ASCII = qn('w:ascii')
+QN_HANSI = qn('w:hAnsi')
+QN_EASTASIA = qn('w:eastAsia')
+QN_CS = qn('w:cs')
+QN_PPR = qn('w:pPr')
+
+# 引号转换需处理的字符：成组反引号、直双引号、直单引号
+QUOTE_SCAN_RE = re.compile(r'`+|["\']')
+
 
 def convert_quotes_to_chinese(text):
     """将英文引号转换为中文引号（交替状态机版）
@@ -30,70 +72,54 @@ def convert_quotes_to_chinese(text):
     if ('"' not in text) and ("'" not in text):
         return text
 
-    result = []
-    i = 0
+    if ("'" not in text) and ('`' not in text):
+        # 只有双引号且无代码片段：开闭引号严格交替，按 split 结果直接拼接
+        parts = text.split('"')
+        pieces = [parts[0]]
+        for k in range(1, len(parts)):
+            pieces.append('\u201c' if k & 1 else '\u201d')
+            pieces.append(parts[k])
+        text = ''.join(pieces)
+        print(f"✅ 引号转换: {original_text} → {text}")
+        return text
+
     in_code = False  # 是否处于 `code` 片段中
 
     # 交替状态机：0=等待开引号，1=等待闭引号
     double_quote_state = 0
     single_quote_state = 0
 
-    while i < len(text):
-        ch = text[i]
-
-        # 处理反引号包裹的代码片段，保持原样
-        if ch == '`':
-            # 统计连续反引号的数量（支持 ``` 块 及 ` 行内`）
-            j = i + 1
-            while j < len(text) and text[j] == '`':
-                j += 1
-            backtick_count = j - i
-            result.append('`' * backtick_count)
-            in_code = not in_code  # 简化处理：遇到成组反引号时翻转状态
-            i = j
-            continue
+    def replace(match):
+        nonlocal in_code, double_quote_state, single_quote_state
+        ch = match.group()
+
+        # 成组反引号（支持 ``` 块 及 ` 行内`）：保持原样，翻转代码片段状态
+        if ch[0] == '`':
+            in_code = not in_code
+            return ch
 
         if in_code:
             # 代码片段内不做引号更换
-            result.append(ch)
-            i += 1
-            continue
+            return ch
 
         if ch == '"':
             # 使用交替状态机：第一个是开引号，第二个是闭引号，以此类推
-            if double_quote_state == 0:
-                result.append('\u201c')  # 中文开双引号 "
-                double_quote_state = 1  # 下一个是闭引号
-            else:
-                result.append('\u201d')  # 中文闭双引号 "
-                double_quote_state = 0  # 重置，下一个是开引号
-            i += 1
-            continue
-
-        if ch == "'":
-            # 保留英文缩写/所有格中的撇号：字母-撇号-字母
-            prev_c = text[i - 1] if i > 0 else ''
-            next_c = text[i + 1] if i + 1 < len(text) else ''
-            if prev_c.isalpha() and next_c.isalpha():
-                result.append("'")
-                i += 1
-                continue
+            double_quote_state ^= 1
+            return '\u201c' if double_quote_state else '\u201d'
 
-            # 使用交替状态机
-            if single_quote_state == 0:
-                result.append('\u2018')  # 中文开单引号 '
-                single_quote_state = 1
-            else:
-                result.append('\u2019')  # 中文闭单引号 '
-                single_quote_state = 0
-            i += 1
-            continue
+        # 保留英文缩写/所有格中的撇号：字母-撇号-字母
+        source = match.string
+        i = match.start()
+        prev_c = source[i - 1] if i > 0 else ''
+        next_c = source[i + 1] if i + 1 < len(source) else ''
+        if prev_c.isalpha() and next_c.isalpha():
+            return ch
 
-        # 其它字符保持
-        result.append(ch)
-        i += 1
+        single_quote_state ^= 1
+        return '\u2018' if single_quote_state else '\u2019'
 
-    text = ''.join(result)
+    # 正则引擎定位反引号组与引号，其余字符原样保留，无需逐字符循环
+    text = QUOTE_SCAN_RE.sub(replace, text)
 
     if text != original_text:
         print(f"✅ 引号转换: {original_text} → {text}")
@@ -101,93 +127,108 @@ def convert_quotes_to_chinese(text):
     return text
 
 
-def parse_text_formatting(paragraph, text, title_level=0, is_quote=False):
-    """解析文本格式（支持加粗、斜体、下划线，转换引号为中文）"""
+def split_br(text):
+    """按 <br> 标签拆分文本；不含 '<' 时（绝大多数段落）直接返回原文，省去正则调用"""
+    if '<' not in text:
+        return (text,)
+    return BR_TAG_RE.split(text)
+
+
+def parse_text_formatting(paragraph, text, title_level=0, is_quote=False, size=None):
+    """解析文本格式（支持加粗、斜体、下划线，转换引号为中文）
+    size 不为 None 时，所有 run（含换行 run）统一使用该字号
+    """
 
     # 转换英文引号为中文引号
     text = convert_quotes_to_chinese(text)
 
     # 先处理<br>标签为段内换行
-    segments = re.split(r'<br\s*/?>', text, flags=re.IGNORECASE)
-
-    # 使用正则表达式解析所有格式标记
-    format_patterns = [
-        (r'\*\*\*(.*?)\*\*\*', {'bold': True, 'italic': True}),
-        (r'___(.*?)___', {'bold': True, 'italic': True}),
-        (r'\*\*(.*?)\*\*', {'bold': True}),
-        (r'__(.*?)__', {'bold': True}),
-        (r'(?<!\*)\*([^*\n]+?)\*(?!\*)', {'italic': True}),
-        (r'(?<!_)_([^_\n]+?)_(?!_)', {'italic': True}),
-        (r'<u>(.*?)</u>', {'underline': True}),
-        (r'~~(.*?)~~', {'strikethrough': True}),
-        (r'`([^`\n]+)`', {'code': True}),
-        (r'\$([^$\n]+?)\$', {'math': True}),  # LaTeX数学公式支持
-    ]
+    segments = split_br(text)
 
     for idx, segment in enumerate(segments):
-        text_parts = parse_formatted_text(segment, format_patterns)
+        text_parts = parse_formatted_text(segment, INLINE_FORMAT_PATTERNS)
         for part_text, formats in text_parts:
             if part_text:  # 只有非空文本才创建run
                 run = paragraph.add_run(part_text)
-                set_run_format_with_styles(run, formats, title_level=title_level, is_quote=is_quote)
+                set_run_format_with_styles(run, formats, title_level=title_level, is_quote=is_quote, size=size)
         if idx < len(segments) - 1:
-            paragraph.add_run().add_break()
+            run = paragraph.add_run()
+            run.add_break()
+            if size is not None:
+                # 换行 run 按基础格式设置后再覆盖字号（否则 set_paragraph_format 会按正文字号补设）
+                set_run_format(run, title_level)
+                run.font.size = size
+
+
+# 格式模式源码元组 -> 合并后的交替正则
+_COMBINED_FORMAT_RE_CACHE = {}
+
+
+def _combined_format_regex(format_patterns):
+    """将一组格式模式合并为单个交替正则，用于一次扫描判断是否存在任何格式"""
+    if format_patterns is INLINE_FORMAT_PATTERNS:
+        return INLINE_FORMAT_ANY_RE
+    key = tuple(getattr(pattern, 'pattern', pattern) for pattern, _ in format_patterns)
+    combined = _COMBINED_FORMAT_RE_CACHE.get(key)
+    if combined is None:
+        combined = re.compile('|'.join(f'(?:{source})' for source in key))
+        _COMBINED_FORMAT_RE_CACHE[key] = combined
+    return combined
 
 
 def parse_formatted_text(text, format_patterns):
-    """解析带格式的文本，返回(文本, 格式)的列表"""
+    """解析带格式的文本，返回(文本, 格式)的列表
+
+    format_patterns 为 (已编译正则, 格式字典) 列表，通常直接传入 INLINE_FORMAT_PATTERNS。
+    """
 
     if not text:
         return []
 
+    # 快速路径：不含任何格式标记字符时无需逐个正则扫描
+    if not FORMAT_MARKER_RE.search(text):
+        return [(text, {})]
+
+    # 合并正则一次扫描：没有任何模式能匹配时整段即为普通文本
+    if not _combined_format_regex(format_patterns).search(text):
+        return [(text, {})]
+
     parts = []
     current_pos = 0
 
-    # 查找所有格式标记的位置
+    # 查找所有格式标记的位置：(起点, 终点, 格式内文本, 格式)
     all_matches = []
     for pattern, format_dict in format_patterns:
-        for match in re.finditer(pattern, text):
-            all_matches.append({
-                'start': match.start(),
-                'end': match.end(),
-                'text': match.group(1),
-                'format': format_dict,
-                'full_match': match.group(0)
-            })
+        for match in pattern.finditer(text):
+            all_matches.append((match.start(), match.end(), match.group(1), format_dict))
 
     # 按开始位置排序
-    all_matches.sort(key=lambda x: x['start'])
+    all_matches.sort(key=lambda x: x[0])
 
     # 处理重叠的匹配（选择最长的匹配）
+    # 已保留的匹配互不重叠且按起点有序，新匹配起点不早于它们，只可能与最后一个重叠，线性扫描即可
     filtered_matches = []
     for match in all_matches:
-        # 检查是否与已有匹配重叠
-        overlap = False
-        for existing in filtered_matches:
-            if (match['start'] < existing['end'] and match['end'] > existing['start']):
+        if filtered_matches:
+            last = filtered_matches[-1]
+            if match[0] < last[1]:
                 # 有重叠，选择更长的匹配
-                if len(match['full_match']) > len(existing['full_match']):
-                    filtered_matches.remove(existing)
-                    filtered_matches.append(match)
-                overlap = True
-                break
-        if not overlap:
-            filtered_matches.append(match)
-
-    # 重新按位置排序
-    filtered_matches.sort(key=lambda x: x['start'])
+                if match[1] - match[0] > last[1] - last[0]:
+                    filtered_matches[-1] = match
+                continue
+        filtered_matches.append(match)
 
     # 构建文本部分列表
-    for match in filtered_matches:
+    for start, end, inner_text, format_dict in filtered_matches:
         # 添加前面的普通文本
-        if current_pos < match['start']:
-            normal_text = text[current_pos:match['start']]
+        if current_pos < start:
+            normal_text = text[current_pos:start]
             if normal_text:
                 parts.append((normal_text, {}))
 
         # 添加格式化文本
-        parts.append((match['text'], match['format']))
-        current_pos = match['end']
+        parts.append((inner_text, format_dict))
+        current_pos = end
 
     # 添加剩余的普通文本
     if current_pos < len(text):
@@ -202,114 +243,149 @@ def parse_formatted_text(text, format_patterns):
     return parts
 
 
+def set_run_fonts(run, ascii_font, east_asia_font, cs_font=None):
+    """设置 run 的字体映射：ascii/hAnsi 为西文字体，eastAsia 为中文字体，cs 可选
+
+    只取一次 <w:rFonts> 元素，再依次写入各属性。
+    """
+    r_fonts = run._element.rPr.rFonts
+    r_fonts.set(QN_ASCII, ascii_font)
+    r_fonts.set(QN_HANSI, ascii_font)
+    r_fonts.set(QN_EASTASIA, east_asia_font)
+    if cs_font is not None:
+        r_fonts.set(QN_CS, cs_font)
+
+
+# run 基础格式：西文字体、中文字体、字号、是否加粗
+RunStyle = namedtuple('RunStyle', ['ascii_font', 'east_asia_font', 'size', 'bold'])
+
+# 行内代码 / 公式格式：字体、字号、颜色、是否斜体（代码为 None，不设置）
+InlineStyle = namedtuple('InlineStyle', ['font', 'size', 'rgb', 'italic'])
+
+# 按标题级别预解析的 run 基础格式，配置切换时重建
+_run_styles = {}
+_run_styles_config = None
+
+
+def _get_run_styles(config):
+    """获取 run 基础格式查找表：一至四级标题按级别，另含 'body'（正文）与 'quote'（引用），
+    以及 'code'、'math' 两种行内格式（InlineStyle）
+    """
+    global _run_styles, _run_styles_config
+    if _run_styles_config is not config:
+        font_config = config.get('fonts.default', {})
+        ascii_font = font_config.get('ascii', 'Times New Roman')
+        east_asia_font = font_config.get('name', '仿宋_GB2312')
+
+        styles = {
+            'body': RunStyle(ascii_font, east_asia_font, Pt(font_config.get('size', 12)), False),
+            # 引用使用较小字号
+            'quote': RunStyle(ascii_font, east_asia_font, Pt(9), False),
+        }
+        for level, default_size, default_bold in ((1, 15, True), (2, 12, True), (3, 12, False), (4, 12, False)):
+            title_config = config.get(f'titles.level{level}', {})
+            styles[level] = RunStyle(
+                ascii_font,
+                east_asia_font,
+                Pt(title_config.get('size', default_size)),
+                title_config.get('bold', default_bold),
+            )
+
+        code_config = config.get('inline_code', {})
+        styles['code'] = InlineStyle(
+            code_config.get('font', 'Times New Roman'),
+            Pt(code_config.get('size', 10)),
+            hex_to_rgb(code_config.get('color', '#333333')),
+            None,
+        )
+        math_config = config.get('math', {})
+        styles['math'] = InlineStyle(
+            math_config.get('font', 'Times New Roman'),
+            Pt(math_config.get('size', 11)),
+            hex_to_rgb(math_config.get('color', '#00008B')),
+            math_config.get('italic', True),
+        )
+        _run_styles = styles
+        _run_styles_config = config
+    return _run_styles
+
+
 def set_run_format(run, title_level=0):
     """设置文本运行格式（基础版本，用于标题）"""
-    config = get_config()
-    font_config = config.get('fonts.default', {})
+    styles = _get_run_styles(get_config())
+    style = styles.get(title_level, styles['body'])
 
     font = run.font
-    font.name = font_config.get('ascii', 'Times New Roman')
-    font.color.rgb = RGBColor(0, 0, 0)
+    font.name = style.ascii_font
+    font.color.rgb = BLACK
     font.bold = False
     font.italic = False
     font.underline = False
 
     # 设置字体映射
-    run._element.rPr.rFonts.set(qn('w:ascii'), font_config.get('ascii', 'Times New Roman'))
-    run._element.rPr.rFonts.set(qn('w:hAnsi'), font_config.get('ascii', 'Times New Roman'))
-    run._element.rPr.rFonts.set(qn('w:eastAsia'), font_config.get('name', '仿宋_GB2312'))
-    run._element.rPr.rFonts.set(qn('w:cs'), font_config.get('ascii', 'Times New Roman'))
+    set_run_fonts(run, style.ascii_font, style.east_asia_font, style.ascii_font)
 
     # 根据标题级别设置字号和加粗
-    if title_level == 1:
-        title_config = config.get('titles.level1', {})
-        font.size = Pt(title_config.get('size', 15))
-        font.bold = title_config.get('bold', True)
-    elif title_level == 2:
-        title_config = config.get('titles.level2', {})
-        font.size = Pt(title_config.get('size', 12))
-        font.bold = title_config.get('bold', True)
-    elif title_level == 3:
-        title_config = config.get('titles.level3', {})
-        font.size = Pt(title_config.get('size', 12))
-        font.bold = title_config.get('bold', False)
-    elif title_level == 4:
-        title_config = config.get('titles.level4', {})
-        font.size = Pt(title_config.get('size', 12))
-        font.bold = title_config.get('bold', False)
-    else:
-        font.size = Pt(font_config.get('size', 12))
-        font.bold = False
+    font.size = style.size
+    font.bold = style.bold
 
 
-def set_run_format_with_styles(run, formats, title_level=0, is_quote=False):
-    """设置文本运行格式（支持多种样式）"""
+def set_run_format_with_styles(run, formats, title_level=0, is_quote=False, size=None):
+    """设置文本运行格式（支持多种样式），size 不为 None 时最终覆盖字号"""
     config = get_config()
-    font_config = config.get('fonts.default', {})
+    styles = _get_run_styles(config)
+    # 一、二级标题按级别；引用使用较小字号；其余（含三、四级标题）按正文
+    if title_level in (1, 2):
+        style = styles[title_level]
+    elif is_quote:
+        style = styles['quote']
+    else:
+        style = styles['body']
 
     font = run.font
-    font.name = font_config.get('ascii', 'Times New Roman')
-    font.color.rgb = RGBColor(0, 0, 0)
+    font.name = style.ascii_font
+    font.color.rgb = BLACK
 
     # 设置字体映射
-    run._element.rPr.rFonts.set(qn('w:ascii'), font_config.get('ascii', 'Times New Roman'))
-    run._element.rPr.rFonts.set(qn('w:hAnsi'), font_config.get('ascii', 'Times New Roman'))
-    run._element.rPr.rFonts.set(qn('w:eastAsia'), font_config.get('name', '仿宋_GB2312'))
-    run._element.rPr.rFonts.set(qn('w:cs'), font_config.get('ascii', 'Times New Roman'))
+    set_run_fonts(run, style.ascii_font, style.east_asia_font, style.ascii_font)
 
     # 设置基础格式
-    if title_level == 1:
-        title_config = config.get('titles.level1', {})
-        font.size = Pt(title_config.get('size', 15))
-        font.bold = title_config.get('bold', True)
-    elif title_level == 2:
-        title_config = config.get('titles.level2', {})
-        font.size = Pt(title_config.get('size', 12))
-        font.bold = title_config.get('bold', True)
-    elif is_quote:
-        # 引用使用较小字号
-        font.size = Pt(9)
-        font.bold = False
-    else:
-        font.size = Pt(font_config.get('size', 12))
-        font.bold = False
-
-    # 应用Markdown格式
-    if formats.get('code', False):
-        code_config = config.get('inline_code', {})
-        font.name = code_config.get('font', 'Times New Roman')
-        font.size = Pt(code_config.get('size', 10))
-        font.color.rgb = hex_to_rgb(code_config.get('color', '#333333'))
-        run._element.rPr.rFonts.set(qn('w:ascii'), font.name)
-        run._element.rPr.rFonts.set(qn('w:hAnsi'), font.name)
-        run._element.rPr.rFonts.set(qn('w:eastAsia'), font.name)
-    elif formats.get('math', False):
-        math_config = config.get('math', {})
-        font.name = math_config.get('font', 'Times New Roman')
-        font.size = Pt(math_config.get('size', 11))
-        font.italic = math_config.get('italic', True)
-        font.color.rgb = hex_to_rgb(math_config.get('color', '#00008B'))
-        run._element.rPr.rFonts.set(qn('w:ascii'), font.name)
-        run._element.rPr.rFonts.set(qn('w:hAnsi'), font.name)
-        run._element.rPr.rFonts.set(qn('w:eastAsia'), font.name)
-    else:
-        if formats.get('bold', False):
-            font.bold = True
-        if formats.get('italic', False):
-            font.italic = True
-        if formats.get('underline', False):
-            font.underline = True
-        if formats.get('strikethrough', False):
-            font.strike = True
-
-
-def set_paragraph_format(paragraph, title_level=0, is_quote=False):
-    """设置段落格式"""
-    config = get_config()
+    font.size = style.size
+    font.bold = style.bold
+
+    # 应用Markdown格式（纯文本 run 的 formats 为空，无需逐项查询）
+    if formats:
+        if formats.get('code', False) or formats.get('math', False):
+            # 行内代码 / 公式格式已按配置预解析
+            inline = styles['code'] if formats.get('code', False) else styles['math']
+            font.name = inline.font
+            font.size = inline.size
+            if inline.italic is not None:
+                font.italic = inline.italic
+            font.color.rgb = inline.rgb
+            set_run_fonts(run, inline.font, inline.font)
+        else:
+            if formats.get('bold', False):
+                font.bold = True
+            if formats.get('italic', False):
+                font.italic = True
+            if formats.get('underline', False):
+                font.underline = True
+            if formats.get('strikethrough', False):
+                font.strike = True
+
+    if size is not None:
+        font.size = size
+
+
+# 段落格式 <w:pPr> 模板：(title_level, is_quote) -> 已设置格式的 pPr 元素，配置切换时清空
+_PPR_TEMPLATES = {}
+_ppr_templates_config = None
+
+
+def _apply_paragraph_format(paragraph_format, config, title_level=0, is_quote=False):
+    """按配置逐项设置段落格式属性"""
     paragraph_config = config.get('paragraph', {})
-
-    # 设置段落格式
-    paragraph_format = paragraph.paragraph_format
     paragraph_format.line_spacing = paragraph_config.get('line_spacing', 1.5)
 
     if title_level == 1:
@@ -358,14 +434,46 @@ def set_paragraph_format(paragraph, title_level=0, is_quote=False):
         paragraph_format.space_after = Pt(0)
         paragraph_format.first_line_indent = Pt(paragraph_config.get('first_line_indent', 24))
 
+
+def _get_ppr_template(config, title_level, is_quote):
+    """获取（必要时生成）对应段落类型的 <w:pPr> 模板"""
+    global _ppr_templates_config
+    if _ppr_templates_config is not config:
+        _PPR_TEMPLATES.clear()
+        _ppr_templates_config = config
+
+    key = (title_level, is_quote)
+    template = _PPR_TEMPLATES.get(key)
+    if template is None:
+        scratch = OxmlElement('w:p')
+        _apply_paragraph_format(ParagraphFormat(scratch), config, title_level, is_quote)
+        template = scratch.pPr
+        _PPR_TEMPLATES[key] = template
+    return template
+
+
+def set_paragraph_format(paragraph, title_level=0, is_quote=False):
+    """设置段落格式
+
+    段落尚无 <w:pPr> 时直接插入缓存模板的副本；已有 pPr（如引用块底纹）时逐项设置属性。
+    """
+    config = get_config()
+
+    p = paragraph._p
+    if p.find(QN_PPR) is None:
+        p.insert(0, deepcopy(_get_ppr_template(config, title_level, is_quote)))
+    else:
+        _apply_paragraph_format(paragraph.paragraph_format, config, title_level, is_quote)
+
     # 确保所有runs都有正确的格式
     for run in paragraph.runs:
         if not hasattr(run.font, 'name') or not run.font.name:
             set_run_format(run, title_level)
 
 
+@lru_cache(maxsize=128)
 def parse_alignment(align_str: str):
-    """将字符串对齐方式转换为 WD_PARAGRAPH_ALIGNMENT 常量"""
+    """将字符串对齐方式转换为 WD_PARAGRAPH_ALIGNMENT 常量（输入取值有限，结果缓存）"""
     align_str = align_str.lower()
     if align_str == 'left':
         return WD_PARAGRAPH_ALIGNMENT.LEFT
@@ -377,12 +485,13 @@ def parse_alignment(align_str: str):
         return WD_PARAGRAPH_ALIGNMENT.JUSTIFY
 
 
+@lru_cache(maxsize=128)
 def hex_to_rgb(hex_color: str):
-    """将十六进制颜色转换为 RGBColor"""
+    """将十六进制颜色转换为 RGBColor（RGBColor 不可变，结果可安全复用）"""
     hex_color = hex_color.lstrip('#')
     if len(hex_color) == 6:
         r = int(hex_color[0:2], 16)
         g = int(hex_color[2:4], 16)
         b = int(hex_color[4:6], 16)
         return RGBColor(r, g, b)
-    return RGBColor(0, 0, 0)  # 默认黑色
+    return BLACK  # 默认黑色
@@ -8,17 +8,23 @@ Markdown到Word文档转换工具
 """
 
 import os
+import io
 import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 import re
 import glob
-import tempfile
+import zipfile
+from copy import deepcopy
+from functools import lru_cache
+from array import array
+from bisect import bisect_left
 
 from docx import Document
 from docx.shared import Pt, Inches, Cm, RGBColor
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.oxml.ns import qn
+from docx.oxml.ns import qn, nsdecls
 from docx.oxml import parse_xml
-from docx.oxml.shared import OxmlElement
 from PIL import Image
 
 # 导入配置模块
@@ -32,13 +38,47 @@ from formatter import (
     set_paragraph_format,
     parse_alignment,
     hex_to_rgb,
+    QN_ASCII,
+    QN_HANSI,
+    QN_EASTASIA,
+    QN_CS,
 )
 from table_handler import (
     is_table_row,
     create_word_table,
     create_word_table_from_html,
 )
-from chart_handler import create_mermaid_chart
+from chart_handler import create_mermaid_chart, prerender_mermaid_charts
+
+
+# ============================================================================
+# 块级元素正则（模块级预编译，主循环中直接复用）
+# ============================================================================
+
+MERMAID_FENCE_RE = re.compile(r'^```\s*mermaid\b')
+NUM_LIST_RE = re.compile(r'^\d+\.\s')
+QUOTE_BULLET_RE = re.compile(r'^\s*([-*+])\s+')
+QUOTE_NUMBER_RE = re.compile(r'^\s*(\d+\.)\s+')
+# 连续的引用行（行首可有空白，与 strip() 后以 '>' 开头等价），在原文上一次匹配整个引用块
+QUOTE_RUN_RE = re.compile(r'(?:[^\S\n]*>[^\n]*(?:\n|\Z))+')
+# HTML 表格起止标签（忽略大小写匹配，无需为每行生成 lower() 副本）
+HTML_TABLE_OPEN_RE = re.compile(r'<table>', re.IGNORECASE)
+HTML_TABLE_CLOSE_RE = re.compile(r'</table>', re.IGNORECASE)
+
+# 脚本所在目录（模块加载时解析一次）
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 清空模板时需要移除的 body 子元素
+TEMPLATE_CLEAR_TAGS = (qn('w:p'), qn('w:tbl'))
+
+# 页码域（begin / instrText / end），每种域只解析一次，使用时复制子元素
+PAGE_FIELD_TEMPLATES = {
+    instr: parse_xml(
+        f'<w:r {nsdecls("w")}><w:fldChar w:fldCharType="begin"/>'
+        f'<w:instrText> {instr} </w:instrText><w:fldChar w:fldCharType="end"/></w:r>'
+    )
+    for instr in ('PAGE', 'NUMPAGES')
+}
 
 
 # ============================================================================
@@ -75,8 +115,8 @@ def _postprocess_image_for_word(image, target_display_cm, target_dpi=260):
     return image
 
 
-def insert_image_to_word(doc, image):
-    """将PIL图片对象插入Word文档"""
+def _image_display_params():
+    """根据页面与图片配置计算 (目标显示宽度cm, 目标DPI)"""
     config = get_config()
     image_config = config.get('image', {})
     page_config = config.get('page', {})
@@ -85,30 +125,54 @@ def insert_image_to_word(doc, image):
     max_width_cm = image_config.get('max_width_cm', 14.2)
     target_dpi = image_config.get('target_dpi', 260)
 
-    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
-        page_width = page_config.get('width', 21.0)
-        margin_left = page_config.get('margin_left', 3.18)
-        margin_right = page_config.get('margin_right', 3.18)
-        available_width_cm = page_width - margin_left - margin_right
-        target_display_cm = min(available_width_cm * display_ratio, max_width_cm)
-        image = _postprocess_image_for_word(image, target_display_cm, target_dpi=target_dpi)
-        try:
-            image.save(temp_file.name, format='PNG', optimize=True, compress_level=9)
-        except Exception:
-            image.save(temp_file.name, format='PNG', optimize=True)
-        temp_filename = temp_file.name
+    page_width = page_config.get('width', 21.0)
+    margin_left = page_config.get('margin_left', 3.18)
+    margin_right = page_config.get('margin_right', 3.18)
+    available_width_cm = page_width - margin_left - margin_right
+    target_display_cm = min(available_width_cm * display_ratio, max_width_cm)
+    return target_display_cm, target_dpi
+
 
+def _add_centered_picture(doc, image_source, width_cm):
+    """在居中段落中插入图片（文件路径或文件对象）"""
+    paragraph = doc.add_paragraph()
+    paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    run = paragraph.add_run()
+    run.add_picture(image_source, width=Cm(width_cm))
+
+
+def insert_image_to_word(doc, image):
+    """将PIL图片对象插入Word文档（在内存中编码 PNG，不经过临时文件）"""
+    target_display_cm, target_dpi = _image_display_params()
+
+    image = _postprocess_image_for_word(image, target_display_cm, target_dpi=target_dpi)
+    buffer = io.BytesIO()
     try:
-        paragraph = doc.add_paragraph()
-        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        img_width_cm = target_display_cm
-        run = paragraph.add_run()
-        run.add_picture(temp_filename, width=Cm(img_width_cm))
-    finally:
-        try:
-            os.unlink(temp_filename)
-        except:
-            pass
+        image.save(buffer, format='PNG', optimize=True, compress_level=6)
+    except Exception:
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', optimize=True)
+    buffer.seek(0)
+
+    _add_centered_picture(doc, buffer, target_display_cm)
+
+
+def insert_image_path_to_word(doc, image_path):
+    """将磁盘上的图片文件插入Word文档
+
+    图片宽度不超过目标像素宽度时直接嵌入原文件，跳过 PIL 解码与 PNG 重新编码；
+    否则按 insert_image_to_word 下采样后插入。
+    """
+    target_display_cm, target_dpi = _image_display_params()
+    target_px_width = max(1, int(float(target_display_cm) / 2.54 * target_dpi))
+
+    # Image.open 只读取文件头，不解码像素
+    with Image.open(image_path) as image:
+        if image.width > target_px_width:
+            insert_image_to_word(doc, image)
+            return
+
+    _add_centered_picture(doc, image_path, target_display_cm)
 
 
 # ============================================================================
@@ -175,6 +239,14 @@ def add_numbered_list(doc, line):
     set_paragraph_format(p)
 
 
+@lru_cache(maxsize=16)
+def get_quote_ppr(fill):
+    """引用块段落 <w:pPr> 模板（仅含底纹 <w:shd>），按填充色只解析一次，使用时复制"""
+    return parse_xml(
+        f'<w:pPr {nsdecls("w")}><w:shd w:val="clear" w:color="auto" w:fill="{fill}"/></w:pPr>'
+    )
+
+
 def add_quote(doc, text):
     """添加引用块"""
     config = get_config()
@@ -182,9 +254,9 @@ def add_quote(doc, text):
     
     lines = text.split('\n')
     
-    bg_color = quote_config.get('background_color', '#EAEAEA')
-    left_indent = quote_config.get('left_indent_inches', 0.2)
-    font_size = quote_config.get('font_size', 9)
+    quote_ppr = get_quote_ppr(quote_config.get('background_color', '#EAEAEA').lstrip('#'))
+    left_indent = Inches(quote_config.get('left_indent_inches', 0.2))
+    font_size = Pt(quote_config.get('font_size', 9))
     line_spacing = quote_config.get('line_spacing', 1.5)
     
     for line_index, line in enumerate(lines):
@@ -195,18 +267,15 @@ def add_quote(doc, text):
         
         p = doc.add_paragraph()
         
-        pPr = p._p.get_or_add_pPr()
-        shd = OxmlElement('w:shd')
-        shd.set(qn('w:val'), 'clear')
-        shd.set(qn('w:color'), 'auto')
-        shd.set(qn('w:fill'), bg_color.lstrip('#'))
-        pPr.append(shd)
+        # 新段落尚无 pPr，直接插入带底纹的模板副本
+        p._p.insert(0, deepcopy(quote_ppr))
         
-        p.paragraph_format.left_indent = Inches(left_indent)
-        p.paragraph_format.line_spacing = line_spacing
+        paragraph_format = p.paragraph_format
+        paragraph_format.left_indent = left_indent
+        paragraph_format.line_spacing = line_spacing
         
-        bullet_match = re.match(r'^\s*([-*+])\s+', line)
-        number_match = re.match(r'^\s*(\d+\.)\s+', line)
+        bullet_match = QUOTE_BULLET_RE.match(line)
+        number_match = QUOTE_NUMBER_RE.match(line)
         
         list_marker_run = None
         
@@ -220,14 +289,11 @@ def add_quote(doc, text):
             line = line[number_match.end():]
         
         if list_marker_run:
-            list_marker_run.font.size = Pt(font_size)
-            set_run_format_with_styles(list_marker_run, {}, is_quote=True)
+            set_run_format_with_styles(list_marker_run, {}, is_quote=True, size=font_size)
         
-        parse_text_formatting(p, line, is_quote=True)
+        # 引用字号在创建 run 时直接设置，无需事后再遍历 p.runs
+        parse_text_formatting(p, line, is_quote=True, size=font_size)
         set_paragraph_format(p, is_quote=True)
-        
-        for run in p.runs:
-            run.font.size = Pt(font_size)
 
 
 def add_code_block(doc, code_lines, language):
@@ -244,20 +310,30 @@ def add_code_block(doc, code_lines, language):
         lang_run.font.color.rgb = hex_to_rgb(label_config.get('color', '#808080'))
     
     content_config = code_config.get('content', {})
-    left_indent = content_config.get('left_indent', 24)
+    left_indent = Pt(content_config.get('left_indent', 24))
     line_spacing = content_config.get('line_spacing', 1.2)
     font_name = content_config.get('font', 'Times New Roman')
-    font_size = content_config.get('size', 10)
-    color_hex = content_config.get('color', '#333333')
+    font_size = Pt(content_config.get('size', 10))
+    color = hex_to_rgb(content_config.get('color', '#333333'))
     
+    # 每行仍是独立段落（保持缩进与行距版式），长度、颜色只解析一次
+    add_paragraph = doc.add_paragraph
     for code_line in code_lines:
-        p = doc.add_paragraph()
-        run = p.add_run(code_line or ' ')
-        run.font.name = font_name
-        run.font.size = Pt(font_size)
-        run.font.color.rgb = hex_to_rgb(color_hex)
-        p.paragraph_format.left_indent = Pt(left_indent)
-        p.paragraph_format.line_spacing = line_spacing
+        p = add_paragraph()
+        font = p.add_run(code_line or ' ').font
+        font.name = font_name
+        font.size = font_size
+        font.color.rgb = color
+        paragraph_format = p.paragraph_format
+        paragraph_format.left_indent = left_indent
+        paragraph_format.line_spacing = line_spacing
+
+
+def add_page_field(paragraph, instr):
+    """在段落末尾追加一个页码域（PAGE / NUMPAGES）"""
+    run = paragraph.add_run()
+    run._r.extend(deepcopy(child) for child in PAGE_FIELD_TEMPLATES[instr])
+    return run
 
 
 def add_page_number(doc):
@@ -290,35 +366,26 @@ def add_page_number(doc):
         
         page_format = page_number_config.get('format', '1/x')
         if '1' in page_format:
-            run = footer_para.add_run()
-            fld_char_begin = parse_xml(r'<w:fldChar w:fldCharType="begin" xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"/>')
-            run._r.append(fld_char_begin)
-            instr_text = parse_xml(r'<w:instrText xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"> PAGE </w:instrText>')
-            run._r.append(instr_text)
-            fld_char_end = parse_xml(r'<w:fldChar w:fldCharType="end" xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"/>')
-            run._r.append(fld_char_end)
+            add_page_field(footer_para, 'PAGE')
         
         if '/' in page_format:
-            sep_run = footer_para.add_run("/")
+            footer_para.add_run("/")
         
         if 'x' in page_format:
-            total_run = footer_para.add_run()
-            fld_char_begin2 = parse_xml(r'<w:fldChar w:fldCharType="begin" xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"/>')
-            total_run._r.append(fld_char_begin2)
-            instr_text2 = parse_xml(r'<w:instrText xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"> NUMPAGES </w:instrText>')
-            total_run._r.append(instr_text2)
-            fld_char_end2 = parse_xml(r'<w:fldChar w:fldCharType="end" xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"/>')
-            total_run._r.append(fld_char_end2)
+            add_page_field(footer_para, 'NUMPAGES')
         
         font_name = page_number_config.get('font', 'Times New Roman')
-        font_size = page_number_config.get('size', 10.5)
+        font_size = Pt(page_number_config.get('size', 10.5))
+        black = RGBColor(0, 0, 0)
         
         for run in footer_para.runs:
-            run.font.name = font_name
-            run.font.size = Pt(font_size)
-            run.font.color.rgb = RGBColor(0, 0, 0)
-            run._element.rPr.rFonts.set(qn('w:ascii'), font_name)
-            run._element.rPr.rFonts.set(qn('w:hAnsi'), font_name)
+            font = run.font
+            font.name = font_name
+            font.size = font_size
+            font.color.rgb = black
+            r_fonts = run._element.rPr.rFonts
+            r_fonts.set(QN_ASCII, font_name)
+            r_fonts.set(QN_HANSI, font_name)
     
     except Exception as e:
         print(f"⚠️  页码添加失败，将跳过页码设置: {e}")
@@ -329,10 +396,10 @@ def add_page_number(doc):
 # 工具函数
 # ============================================================================
 
+@lru_cache(maxsize=1)
 def find_template_file():
-    """查找模板文件"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    skill_dir = os.path.dirname(script_dir)
+    """查找模板文件（结果在进程内缓存）"""
+    skill_dir = os.path.dirname(SCRIPT_DIR)
     templates_dir = os.path.join(skill_dir, 'assets', 'templates')
     docx_files = glob.glob(os.path.join(templates_dir, "*.docx"))
     
@@ -346,39 +413,375 @@ def find_template_file():
 
 
 def find_md_files():
-    """查找脚本所在目录下的所有 .md 文件"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    md_files = glob.glob(os.path.join(script_dir, "*.md"))
-    return md_files
+    """查找脚本所在目录下的所有 .md 文件（与 glob 一致，跳过隐藏文件）"""
+    with os.scandir(SCRIPT_DIR) as it:
+        return [
+            os.path.join(SCRIPT_DIR, entry.name)
+            for entry in it
+            if entry.name.endswith('.md') and not entry.name.startswith('.') and entry.is_file()
+        ]
 
 
 def generate_output_filename(md_file):
     """根据输入文件名生成输出文件名"""
-    base_name = os.path.splitext(md_file)[0]
+    # 常见情形（*.md）直接截掉扩展名；其余（隐藏文件、目录名带点等）交给 splitext
+    base_name, dot, ext = md_file.rpartition('.')
+    if not (dot and ext == 'md' and base_name and base_name[-1] not in '/\\.'):
+        base_name = os.path.splitext(md_file)[0]
     return f"{base_name}_完整版.docx"
 
 
-def debug_quotes_in_file(file_path):
-    """简化的引号调试"""
+def read_markdown_file(file_path):
+    """读取 Markdown 文件：只读一次磁盘，先按 UTF-8 解码，失败时按 GBK 解码
+
+    换行符按文本模式的通用换行规则统一为 '\\n'。
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError:
+        content = data.decode('gbk')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def debug_quotes(content):
+    """简化的引号调试（基于已读入的文本，不再二次读取文件）"""
     print("🔍 检查文件中的引号...")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
     
     ascii_double = content.count('"')
-    chinese_open = content.count('"')
-    chinese_close = content.count('"')
+    chinese_open = content.count('\u201c')
+    chinese_close = content.count('\u201d')
     
     print(f"📊 引号统计: ASCII双引号={ascii_double}, 中文开引号={chinese_open}, 中文闭引号={chinese_close}")
     
-    for i, line in enumerate(content.split('\n'), 1):
-        if '"' in line:
-            print(f"🎯 测试第{i}行: {line.strip()}")
-            _ = convert_quotes_to_chinese(line.strip())
-            break
+    # 直接定位首个 ASCII 双引号所在行，无需拆分全文
+    pos = content.find('"')
+    if pos != -1:
+        start = content.rfind('\n', 0, pos) + 1
+        end = content.find('\n', pos)
+        line = content[start:end] if end != -1 else content[start:]
+        line_number = content.count('\n', 0, start) + 1
+        print(f"🎯 测试第{line_number}行: {line.strip()}")
+        _ = convert_quotes_to_chinese(line.strip())
     
     print("-" * 30)
 
 
+# docx 各部件的压缩级别：word/media/ 下的 PNG/JPEG 本身已压缩，再次高强度压缩几乎不减小体积
+MEDIA_COMPRESS_LEVEL = 3
+XML_COMPRESS_LEVEL = 6
+
+
+class _TunedZipPkgWriter:
+    """按部件类型选择压缩级别的 docx 写入器，接口与 python-docx 的 PhysPkgWriter 一致"""
+
+    def __init__(self, pkg_file):
+        self._zipf = zipfile.ZipFile(pkg_file, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def write(self, pack_uri, blob):
+        membername = pack_uri.membername
+        if membername.startswith('word/media/'):
+            level = MEDIA_COMPRESS_LEVEL
+        else:
+            level = XML_COMPRESS_LEVEL
+        self._zipf.writestr(membername, blob, compresslevel=level)
+
+    def close(self):
+        self._zipf.close()
+
+
+def save_document(doc, output_path):
+    """保存文档，媒体部件使用较低压缩级别；python-docx 内部接口不可用时回退为 doc.save"""
+    try:
+        from docx.opc import pkgwriter
+        original_writer = pkgwriter.PhysPkgWriter
+    except (ImportError, AttributeError):
+        doc.save(output_path)
+        return
+
+    pkgwriter.PhysPkgWriter = _TunedZipPkgWriter
+    try:
+        doc.save(output_path)
+    finally:
+        pkgwriter.PhysPkgWriter = original_writer
+
+
+# ============================================================================
+# 块级元素分派
+# ============================================================================
+
+HORIZONTAL_RULES = ('---', '***', '___')
+
+
+class LineView:
+    """按行访问文本的轻量视图
+
+    只保存原文和各行起始偏移（紧凑整数数组），访问某行时才切片生成字符串，
+    避免 ``content.split('\\n')`` 一次性为每行创建字符串对象。
+    """
+
+    __slots__ = ('text', 'starts', 'n')
+
+    def __init__(self, text):
+        starts = array('Q', [0])
+        pos = text.find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = text.find('\n', pos + 1)
+        # 哨兵：使最后一行也可按 starts[i + 1] - 1 计算结束位置
+        starts.append(len(text) + 1)
+        self.text = text
+        self.starts = starts
+        self.n = len(starts) - 1
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError('line index out of range')
+        return self.text[self.starts[i]:self.starts[i + 1] - 1]
+
+    def run_end(self, pattern, i):
+        """从第 i 行行首起用 pattern 在原文上匹配连续行块，返回块后第一行的行号"""
+        match = pattern.match(self.text, self.starts[i])
+        if match is None:
+            return i
+        return bisect_left(self.starts, match.end(), i)
+
+
+class ConvertState:
+    """单个文档转换过程中的块级状态"""
+
+    __slots__ = ('md_file_path', 'has_seen_h2', 'has_body_before_first_h2', 'mermaid_images')
+
+    def __init__(self, md_file_path):
+        self.md_file_path = md_file_path
+        self.has_seen_h2 = False
+        self.has_body_before_first_h2 = False
+        # 批量预渲染的 Mermaid 图片：预处理后的源码 -> PNG 路径
+        self.mermaid_images = {}
+
+    def mark_body(self):
+        """记录首个二级标题之前出现过正文"""
+        if not self.has_seen_h2:
+            self.has_body_before_first_h2 = True
+
+
+def _handle_fence(doc, lines, i, state):
+    """Mermaid 图表 / 代码块"""
+    n = len(lines)
+    line = lines[i].strip()
+    
+    # Mermaid 图表
+    if MERMAID_FENCE_RE.match(line):
+        mermaid_lines = []
+        i += 1
+        while i < n and not lines[i].strip().startswith('```'):
+            mermaid_lines.append(lines[i])
+            i += 1
+        if i < n:
+            i += 1
+        
+        if mermaid_lines:
+            mermaid_code = '\n'.join(mermaid_lines)
+            create_mermaid_chart(
+                doc,
+                lambda path: insert_image_path_to_word(doc, path),
+                get_image_output_path,
+                lambda: doc.add_paragraph(),
+                lambda p: set_paragraph_format(p),
+                mermaid_code,
+                state.md_file_path,
+                prerendered=state.mermaid_images
+            )
+            state.mark_body()
+            print(f"✅ 处理Mermaid图表")
+        return i
+    
+    # 代码块
+    code_lines = []
+    language = line[3:].strip()
+    i += 1
+    while i < n and not lines[i].strip().startswith('```'):
+        code_lines.append(lines[i])
+        i += 1
+    if i < n:
+        i += 1
+    add_code_block(doc, code_lines, language)
+    state.mark_body()
+    print("✅ 处理代码块")
+    return i
+
+
+def collect_mermaid_blocks(lines):
+    """预扫描文档中的 Mermaid 代码块源码（跳过普通代码块）"""
+    blocks = []
+    i = 0
+    n = len(lines)
+    while i < n:
+        line = lines[i].strip()
+        i += 1
+        if not line.startswith('```'):
+            continue
+        is_mermaid = MERMAID_FENCE_RE.match(line) is not None
+        block_lines = []
+        while i < n and not lines[i].strip().startswith('```'):
+            block_lines.append(lines[i])
+            i += 1
+        i += 1
+        if is_mermaid and block_lines:
+            blocks.append('\n'.join(block_lines))
+    return blocks
+
+
+def _handle_html_table(doc, lines, i, state):
+    """HTML 表格"""
+    n = len(lines)
+    html_table_content = []
+    while i < n:
+        html_table_content.append(lines[i])
+        if HTML_TABLE_CLOSE_RE.search(lines[i]):
+            i += 1
+            break
+        i += 1
+    if html_table_content:
+        create_word_table_from_html(doc, '\n'.join(html_table_content))
+        state.mark_body()
+    return i
+
+
+def _handle_table(doc, lines, i, state):
+    """Markdown 表格"""
+    n = len(lines)
+    table_lines = []
+    while i < n:
+        line = lines[i].strip()
+        if not is_table_row(line):
+            break
+        table_lines.append(line)
+        i += 1
+    if len(table_lines) >= 2:
+        create_word_table(doc, table_lines)
+        state.mark_body()
+        print(f"✅ 处理Markdown表格: {len(table_lines)} 行")
+    return i
+
+
+def _handle_dash(doc, lines, i, state):
+    """以 '-' 开头：分割线 / 任务列表 / 无序列表"""
+    line = lines[i].strip()
+    if line in HORIZONTAL_RULES:
+        add_horizontal_line(doc)
+    elif line.startswith(('- [ ]', '- [x]', '- [X]')):
+        add_task_list(doc, line)
+    elif line.startswith('- '):
+        add_bullet_list(doc, line)
+    else:
+        return _handle_paragraph(doc, lines, i, state)
+    state.mark_body()
+    return i + 1
+
+
+def _handle_star_or_plus(doc, lines, i, state):
+    """以 '*' / '+' 开头：分割线 / 无序列表"""
+    line = lines[i].strip()
+    if line in HORIZONTAL_RULES:
+        add_horizontal_line(doc)
+    elif line.startswith(('* ', '+ ')):
+        add_bullet_list(doc, line)
+    else:
+        return _handle_paragraph(doc, lines, i, state)
+    state.mark_body()
+    return i + 1
+
+
+def _handle_underscore(doc, lines, i, state):
+    """以 '_' 开头：分割线"""
+    if lines[i].strip() in HORIZONTAL_RULES:
+        add_horizontal_line(doc)
+        state.mark_body()
+        return i + 1
+    return _handle_paragraph(doc, lines, i, state)
+
+
+def _handle_digit(doc, lines, i, state):
+    """以数字开头：有序列表"""
+    line = lines[i].strip()
+    if NUM_LIST_RE.match(line):
+        add_numbered_list(doc, line)
+        state.mark_body()
+        return i + 1
+    return _handle_paragraph(doc, lines, i, state)
+
+
+def _handle_quote(doc, lines, i, state):
+    """引用块
+
+    与主循环分派一致，去除首尾空白后以 ``>`` 开头的连续行属于同一引用块；
+    块的结束行由 QUOTE_RUN_RE 在原文上一次匹配得出，无需逐行判断。
+    """
+    end = lines.run_end(QUOTE_RUN_RE, i)
+    quote_lines = [lines[j].strip()[1:].strip() for j in range(i, end)]
+    if quote_lines:
+        add_quote(doc, '\n'.join(quote_lines))
+        state.mark_body()
+    return end
+
+
+def _handle_heading(doc, lines, i, state):
+    """一至四级标题"""
+    line = lines[i].strip()
+    if line.startswith('# '):
+        title_level = 1
+    elif line.startswith('## '):
+        title_level = 2
+    elif line.startswith('### '):
+        title_level = 3
+    elif line.startswith('#### '):
+        title_level = 4
+    else:
+        return _handle_paragraph(doc, lines, i, state)
+    
+    if title_level == 2:
+        if state.has_seen_h2 or state.has_body_before_first_h2:
+            doc.add_paragraph("")
+        state.has_seen_h2 = True
+    
+    title = convert_quotes_to_chinese(line[title_level + 1:].strip())
+    p = doc.add_paragraph()
+    parse_text_formatting(p, title, title_level=title_level)
+    set_paragraph_format(p, title_level=title_level)
+    return i + 1
+
+
+def _handle_paragraph(doc, lines, i, state):
+    """正文段落"""
+    line = lines[i].strip()
+    p = doc.add_paragraph()
+    parse_text_formatting(p, line)
+    set_paragraph_format(p)
+    state.mark_body()
+    return i + 1
+
+
+# 首字符 -> 块级处理函数，未命中时按正文段落处理
+BLOCK_HANDLERS = {
+    '#': _handle_heading,
+    '>': _handle_quote,
+    '-': _handle_dash,
+    '*': _handle_star_or_plus,
+    '+': _handle_star_or_plus,
+    '_': _handle_underscore,
+}
+BLOCK_HANDLERS.update(dict.fromkeys('0123456789', _handle_digit))
+
+
 # ============================================================================
 # 核心转换流程
 # ============================================================================
@@ -391,23 +794,21 @@ def create_word_document(md_file_path, output_path, template_file=None, config:
     print(f"📄 正在处理: {md_file_path}")
     print(f"📋 使用配置: {config.name}")
     
+    # 读取Markdown文件
+    content = read_markdown_file(md_file_path)
+    
     if config.get('quotes.convert_to_chinese', True):
-        debug_quotes_in_file(md_file_path)
+        debug_quotes(content)
     
     # 创建或加载文档
     if template_file and template_file != "none" and os.path.exists(template_file):
         print(f"📋 使用模板文件: {os.path.basename(template_file)}")
         doc = Document(template_file)
         try:
-            for paragraph in list(doc.paragraphs):
-                if paragraph != doc.paragraphs[0]:
-                    p = paragraph._element
-                    p.getparent().remove(p)
-                else:
-                    paragraph.clear()
-            for table in list(doc.tables):
-                t = table._element
-                t.getparent().remove(t)
+            # 一次遍历 body 子元素，直接移除段落与表格（保留 sectPr 等节属性）
+            body = doc.element.body
+            for child in list(body.iterchildren(TEMPLATE_CLEAR_TAGS)):
+                body.remove(child)
         except Exception as e:
             print(f"⚠️ 清空模板内容失败: {e}")
     else:
@@ -420,10 +821,12 @@ def create_word_document(md_file_path, output_path, template_file=None, config:
         font_config = config.get('fonts.default', {})
         normal_style.font.name = font_config.get('ascii', 'Times New Roman')
         normal_style.font.size = Pt(font_config.get('size', 10.5))
-        normal_style._element.rPr.rFonts.set(qn('w:ascii'), font_config.get('ascii', 'Times New Roman'))
-        normal_style._element.rPr.rFonts.set(qn('w:hAnsi'), font_config.get('ascii', 'Times New Roman'))
-        normal_style._element.rPr.rFonts.set(qn('w:eastAsia'), font_config.get('name', '仿宋_GB2312'))
-        normal_style._element.rPr.rFonts.set(qn('w:cs'), font_config.get('ascii', 'Times New Roman'))
+        ascii_font = font_config.get('ascii', 'Times New Roman')
+        r_fonts = normal_style._element.rPr.rFonts
+        r_fonts.set(QN_ASCII, ascii_font)
+        r_fonts.set(QN_HANSI, ascii_font)
+        r_fonts.set(QN_EASTASIA, font_config.get('name', '仿宋_GB2312'))
+        r_fonts.set(QN_CS, ascii_font)
     except Exception as _:
         pass
     
@@ -437,176 +840,37 @@ def create_word_document(md_file_path, output_path, template_file=None, config:
         section.left_margin = Cm(page_config.get('margin_left', 3.18))
         section.right_margin = Cm(page_config.get('margin_right', 3.18))
     
-    # 读取Markdown文件
-    try:
-        with open(md_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except UnicodeDecodeError:
-        with open(md_file_path, 'r', encoding='gbk') as f:
-            content = f.read()
+    lines = LineView(content)
+    state = ConvertState(md_file_path)
+    
+    # 多个 Mermaid 图表时先一次性批量渲染，避免每个图表单独启动 mmdc
+    mermaid_blocks = collect_mermaid_blocks(lines)
+    if len(mermaid_blocks) > 1:
+        state.mermaid_images = prerender_mermaid_charts(mermaid_blocks, get_image_output_path, md_file_path)
     
-    lines = content.split('\n')
-    has_body_before_first_h2 = False
-    has_seen_h2 = False
     i = 0
+    n = len(lines)
     
-    while i < len(lines):
+    while i < n:
         line = lines[i].strip()
         
         if not line:
             i += 1
             continue
         
-        # Mermaid 图表
-        if re.match(r'^```\s*mermaid\b', line):
-            mermaid_lines = []
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                mermaid_lines.append(lines[i])
-                i += 1
-            if i < len(lines):
-                i += 1
-            
-            if mermaid_lines:
-                mermaid_code = '\n'.join(mermaid_lines)
-                create_mermaid_chart(
-                    doc,
-                    lambda img: insert_image_to_word(doc, img),
-                    get_image_output_path,
-                    lambda: doc.add_paragraph(),
-                    lambda p: set_paragraph_format(p),
-                    mermaid_code,
-                    md_file_path
-                )
-                if not has_seen_h2:
-                    has_body_before_first_h2 = True
-                print(f"✅ 处理Mermaid图表")
-            continue
-        
-        # 代码块
+        # 代码块/HTML表格/Markdown表格不受首字符限制，其余按首字符分派
         if line.startswith('```'):
-            code_lines = []
-            language = line[3:].strip()
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                code_lines.append(lines[i])
-                i += 1
-            if i < len(lines):
-                i += 1
-            add_code_block(doc, code_lines, language)
-            if not has_seen_h2:
-                has_body_before_first_h2 = True
-            print("✅ 处理代码块")
-            continue
-        
-        # HTML 表格
-        if '<table>' in line.lower():
-            html_table_content = []
-            while i < len(lines):
-                html_table_content.append(lines[i])
-                if '</table>' in lines[i].lower():
-                    i += 1
-                    break
-                i += 1
-            if html_table_content:
-                create_word_table_from_html(doc, '\n'.join(html_table_content))
-                if not has_seen_h2:
-                    has_body_before_first_h2 = True
-            continue
-        
-        # Markdown 表格
-        if is_table_row(line):
-            table_lines = []
-            while i < len(lines) and is_table_row(lines[i].strip()):
-                table_lines.append(lines[i].strip())
-                i += 1
-            if len(table_lines) >= 2:
-                create_word_table(doc, table_lines)
-                if not has_seen_h2:
-                    has_body_before_first_h2 = True
-                print(f"✅ 处理Markdown表格: {len(table_lines)} 行")
-            continue
-        
-        # 分割线
-        if line in ['---', '***', '___']:
-            add_horizontal_line(doc)
-            if not has_seen_h2:
-                has_body_before_first_h2 = True
-            i += 1
-            continue
-        
-        # 任务列表
-        if line.startswith('- [ ]') or line.startswith('- [x]') or line.startswith('- [X]'):
-            add_task_list(doc, line)
-            if not has_seen_h2:
-                has_body_before_first_h2 = True
-            i += 1
-            continue
-        
-        # 无序列表
-        if line.startswith(('- ', '* ', '+ ')):
-            add_bullet_list(doc, line)
-            if not has_seen_h2:
-                has_body_before_first_h2 = True
-            i += 1
-            continue
-        
-        # 有序列表
-        if re.match(r'^\d+\.\s', line):
-            add_numbered_list(doc, line)
-            if not has_seen_h2:
-                has_body_before_first_h2 = True
-            i += 1
-            continue
-        
-        # 引用块
-        if line.startswith('>'):
-            quote_lines = []
-            while i < len(lines) and lines[i].startswith('>'):
-                quote_lines.append(lines[i][1:].strip())
-                i += 1
-            if quote_lines:
-                add_quote(doc, '\n'.join(quote_lines))
-                if not has_seen_h2:
-                    has_body_before_first_h2 = True
-            continue
-        
-        # 标题
-        if line.startswith('# '):
-            title = convert_quotes_to_chinese(line[2:].strip())
-            p = doc.add_paragraph()
-            parse_text_formatting(p, title, title_level=1)
-            set_paragraph_format(p, title_level=1)
-        elif line.startswith('## '):
-            if has_seen_h2 or has_body_before_first_h2:
-                doc.add_paragraph("")
-            title = convert_quotes_to_chinese(line[3:].strip())
-            p = doc.add_paragraph()
-            parse_text_formatting(p, title, title_level=2)
-            set_paragraph_format(p, title_level=2)
-            has_seen_h2 = True
-        elif line.startswith('### '):
-            title = convert_quotes_to_chinese(line[4:].strip())
-            p = doc.add_paragraph()
-            parse_text_formatting(p, title, title_level=3)
-            set_paragraph_format(p, title_level=3)
-        elif line.startswith('#### '):
-            title = convert_quotes_to_chinese(line[5:].strip())
-            p = doc.add_paragraph()
-            parse_text_formatting(p, title, title_level=4)
-            set_paragraph_format(p, title_level=4)
+            handler = _handle_fence
+        elif '<' in line and HTML_TABLE_OPEN_RE.search(line):
+            handler = _handle_html_table
+        elif is_table_row(line):
+            handler = _handle_table
         else:
-            if line:
-                p = doc.add_paragraph()
-                parse_text_formatting(p, line)
-                set_paragraph_format(p)
-                if not has_seen_h2:
-                    has_body_before_first_h2 = True
-        
-        i += 1
+            handler = BLOCK_HANDLERS.get(line[0], _handle_paragraph)
+        i = handler(doc, lines, i, state)
     
     add_page_number(doc)
-    doc.save(output_path)
+    save_document(doc, output_path)
     print(f"✅ Word文档已生成: {output_path}")
 
 
@@ -614,8 +878,9 @@ def create_word_document(md_file_path, output_path, template_file=None, config:
 # CLI 入口
 # ============================================================================
 
-def main():
-    """主函数"""
+@lru_cache(maxsize=1)
+def build_arg_parser():
+    """构建命令行参数解析器（只构建一次）"""
     parser = argparse.ArgumentParser(
         description='Markdown到Word文档转换工具',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -626,6 +891,7 @@ def main():
   %(prog)s input.md --config=my-config.yaml
   %(prog)s input.md output.docx
   %(prog)s --list-presets
+  %(prog)s --jobs 4
         """
     )
     
@@ -635,8 +901,14 @@ def main():
     parser.add_argument('--config', '-c', help='使用自定义配置文件 (YAML格式)')
     parser.add_argument('--list-presets', action='store_true', help='列出所有可用的预设配置')
     parser.add_argument('--template', '-t', help='Word模板文件路径')
-    
-    args = parser.parse_args()
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='自动模式下并行转换的进程数（默认 1，0 表示 CPU 核数）')
+    return parser
+
+
+def main():
+    """主函数"""
+    args = build_arg_parser().parse_args()
     
     if args.list_presets:
         print("可用的预设配置:")
@@ -671,13 +943,12 @@ def main():
     set_config(config)
     
     if not args.input:
-        auto_mode(config)
+        auto_mode(config, jobs=args.jobs, template_file=args.template)
         return
     
-    script_dir = os.path.dirname(os.path.abspath(__file__))
     md_file = args.input
     if not os.path.isabs(md_file):
-        alt = os.path.join(script_dir, md_file)
+        alt = os.path.join(SCRIPT_DIR, md_file)
         if os.path.exists(alt):
             md_file = alt
     
@@ -697,8 +968,32 @@ def main():
         traceback.print_exc()
 
 
-def auto_mode(config: Config):
-    """自动模式：处理当前目录下的所有.md文件"""
+def _init_worker(config_dict):
+    """子进程初始化：设置当前配置"""
+    set_config(Config(config_dict))
+
+
+def _convert_worker(task):
+    """子进程中转换单个文件，返回 (md_file, 输出日志, 错误信息)"""
+    md_file, output_file, template_file = task
+    log = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(log):
+        try:
+            create_word_document(md_file, output_file, template_file, get_config())
+        except Exception as e:
+            error = str(e)
+    return md_file, log.getvalue(), error
+
+
+def auto_mode(config: Config, jobs: int = 1, template_file=None):
+    """自动模式：处理当前目录下的所有.md文件
+
+    Args:
+        config: 转换配置
+        jobs: 并行进程数，1 为串行，0 为 CPU 核数
+        template_file: Word 模板路径，为 None 时自动查找
+    """
     md_files = find_md_files()
     
     if not md_files:
@@ -722,57 +1017,76 @@ def auto_mode(config: Config):
     
     print("\n开始转换...")
     
-    template_file = find_template_file()
+    if template_file is None:
+        template_file = find_template_file()
     success_count = 0
     
-    for md_file in md_files:
-        output_file = generate_output_filename(md_file)
-        try:
-            create_word_document(md_file, output_file, template_file, config)
-            success_count += 1
-        except Exception as e:
-            print(f"❌ 处理 {md_file} 时出错: {e}")
+    max_workers = jobs if jobs > 0 else os.cpu_count()
+    if max_workers > 1 and len(md_files) > 1:
+        # 各文件转换相互独立且为 CPU 密集型，多进程绕过 GIL 并行处理
+        tasks = [(md_file, generate_output_filename(md_file), template_file) for md_file in md_files]
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(tasks)),
+            initializer=_init_worker,
+            initargs=(config.to_dict(),)
+        ) as executor:
+            for md_file, log, error in executor.map(_convert_worker, tasks):
+                print(log, end='')
+                if error is None:
+                    success_count += 1
+                else:
+                    print(f"❌ 处理 {md_file} 时出错: {error}")
+    else:
+        for md_file in md_files:
+            output_file = generate_output_filename(md_file)
+            try:
+                create_word_document(md_file, output_file, template_file, config)
+                success_count += 1
+            except Exception as e:
+                print(f"❌ 处理 {md_file} 时出错: {e}")
     
     print(f"\n✅ 转换完成！成功处理 {success_count}/{len(md_files)} 个文件")
     print_success_info(None, config)
 
 
 def print_success_info(filename=None, config: Config = None):
-    """打印成功信息"""
+    """打印成功信息（先拼好全部行，一次输出）"""
     if config is None:
         config = get_config()
     
-    print("\n📋 自动应用的格式:")
+    lines = ["\n📋 自动应用的格式:"]
     
     page_config = config.get('page', {})
-    print(f"📄 页面大小: {page_config.get('width', 21.0)}cm × {page_config.get('height', 29.7)}cm")
-    print(f"📐 页边距: 上下{page_config.get('margin_top', 2.54)}cm，左右{page_config.get('margin_left', 3.18)}cm")
+    lines.append(f"📄 页面大小: {page_config.get('width', 21.0)}cm × {page_config.get('height', 29.7)}cm")
+    lines.append(f"📐 页边距: 上下{page_config.get('margin_top', 2.54)}cm，左右{page_config.get('margin_left', 3.18)}cm")
     
     font_config = config.get('fonts.default', {})
-    print(f"📝 字体: {font_config.get('name', '仿宋_GB2312')}")
-    print(f"📏 字号: {font_config.get('size', 12)}pt")
+    lines.append(f"📝 字体: {font_config.get('name', '仿宋_GB2312')}")
+    lines.append(f"📏 字号: {font_config.get('size', 12)}pt")
     
     paragraph_config = config.get('paragraph', {})
-    print(f"📐 行距: {paragraph_config.get('line_spacing', 1.5)}倍")
+    lines.append(f"📐 行距: {paragraph_config.get('line_spacing', 1.5)}倍")
     
     title1_config = config.get('titles.level1', {})
-    print(f"🎯 一级标题: {title1_config.get('size', 15)}pt，{'加粗' if title1_config.get('bold') else '常规'}")
+    lines.append(f"🎯 一级标题: {title1_config.get('size', 15)}pt，{'加粗' if title1_config.get('bold') else '常规'}")
     
     page_number_config = config.get('page_number', {})
     if page_number_config.get('enabled', True):
-        print(f"📄 页码设置: {page_number_config.get('format', '1/x')}格式")
+        lines.append(f"📄 页码设置: {page_number_config.get('format', '1/x')}格式")
     
     quotes_config = config.get('quotes', {})
     if quotes_config.get('convert_to_chinese', True):
-        print("💬 引号转换: 英文引号自动转为中文引号")
+        lines.append("💬 引号转换: 英文引号自动转为中文引号")
     
-    print("📊 表格支持: Markdown表格自动转换")
-    print("📈 图表支持: Mermaid图表本地渲染")
-    print("✨ 格式支持: **加粗**、*斜体*、<u>下划线</u>、~~删除线~~")
-    print("\n🎯 完全无需手动调整！直接可用！")
+    lines.append("📊 表格支持: Markdown表格自动转换")
+    lines.append("📈 图表支持: Mermaid图表本地渲染")
+    lines.append("✨ 格式支持: **加粗**、*斜体*、<u>下划线</u>、~~删除线~~")
+    lines.append("\n🎯 完全无需手动调整！直接可用！")
     
     if filename:
-        print(f"\n📁 输出文件: {filename}")
+        lines.append(f"\n📁 输出文件: {filename}")
+    
+    print('\n'.join(lines))
 
 
 if __name__ == "__main__":
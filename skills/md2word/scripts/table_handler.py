@@ -6,24 +6,110 @@
 """
 
 import re
+from collections import namedtuple
+from html.parser import HTMLParser
+from copy import deepcopy
+from functools import lru_cache
 from docx import Document
 from docx.shared import Pt, Cm
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
-from docx.oxml.ns import qn
+from docx.oxml.ns import qn, nsdecls
 from docx.oxml import parse_xml
-from bs4 import BeautifulSoup
+from docx.oxml.shared import OxmlElement
+from docx.table import _Cell, _Row
+from docx.text.font import Font
+from docx.text.parfmt import ParagraphFormat
 
 # 导入配置模块
 from config import Config, get_config
 
+# 表格分隔行：仅由 '|', '-', ':', 空格、制表符组成
+TABLE_SEP_RE = re.compile(r'[|\-: \t]+')
+
+# rFonts 属性名（qn 结果不变，避免每个 run 重复解析命名空间前缀）
+QN_ASCII = qn('w:ascii')
+QN_HANSI = qn('w:hAnsi')
+QN_EASTASIA = qn('w:eastAsia')
+QN_CS = qn('w:cs')
+
+# 单元格格式标记：各格式模式均至少包含其中一个字符
+CELL_MARKER_RE = re.compile(r'[*_<~`$]')
+# 单元格格式模式（加粗斜体、加粗、斜体、下划线、删除线、行内代码、换行标签、数学公式）合并为一个正则
+CELL_FORMAT_RE = re.compile('|'.join([
+    r'\*\*\*.*?\*\*\*',
+    r'\*\*.*?\*\*',
+    r'\*.*?\*',
+    r'___.*?___',
+    r'__.*?__',
+    r'_.*?_',
+    r'<u>.*?</u>',
+    r'~~.*?~~',
+    r'`.*?`',
+    r'<br\s*/?>',
+    r'\$.*?\$',
+]))
+
+# 表格边框/单元格边距 XML 模板（模块级，只需填入参数）
+TBL_BORDERS_TEMPLATE = (
+    '<w:tblBorders>'
+    + ''.join(
+        f'<w:{side} w:val="single" w:sz="{{width}}" w:space="0" w:color="{{color}}"/>'
+        for side in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV')
+    )
+    + '</w:tblBorders>'
+)
+TBL_CELL_MAR_TEMPLATE = (
+    '<w:tblCellMar>'
+    '<w:top w:w="{top}" w:type="dxa"/>'
+    '<w:left w:w="{left}" w:type="dxa"/>'
+    '<w:bottom w:w="{bottom}" w:type="dxa"/>'
+    '<w:right w:w="{right}" w:type="dxa"/>'
+    '</w:tblCellMar>'
+)
+
+# 表格样式 XML 片段缓存：按参数一次解析 <w:tblBorders> + <w:tblCellMar>，插入时深拷贝
+_TABLE_STYLE_CACHE = {}
+
+
+def get_table_style_elements(border_enabled, border_width, color, top, left, bottom, right):
+    """获取表格边框（可选）与单元格边距元素的副本列表，两者合并为一个片段只解析一次"""
+    key = (border_enabled, border_width, color, top, left, bottom, right)
+    wrapper = _TABLE_STYLE_CACHE.get(key)
+    if wrapper is None:
+        fragments = []
+        if border_enabled:
+            fragments.append(TBL_BORDERS_TEMPLATE.format(width=border_width, color=color))
+        fragments.append(TBL_CELL_MAR_TEMPLATE.format(top=top, left=left, bottom=bottom, right=right))
+        wrapper = _TABLE_STYLE_CACHE[key] = parse_xml(
+            f'<w:tblPr {nsdecls("w")}>{"".join(fragments)}</w:tblPr>'
+        )
+    return [deepcopy(child) for child in wrapper]
+
+
+def apply_table_style(table, table_config):
+    """按表格配置为表格追加边框与单元格边距"""
+    cell_margin = table_config.get('cell_margin', {})
+    try:
+        table._tbl.tblPr.extend(get_table_style_elements(
+            table_config.get('border_enabled', True),
+            table_config.get('border_width', 4),
+            table_config.get('border_color', '#000000').lstrip('#'),
+            cell_margin.get('top', 30),
+            cell_margin.get('left', 60),
+            cell_margin.get('bottom', 30),
+            cell_margin.get('right', 60),
+        ))
+    except Exception:
+        pass
+
 
 def is_separator_line(line):
     """判断是否是表格分隔行。分隔行必须包含'-'，且只能包含'|', '-', ':', ' '等符号。"""
     line = line.strip()
     if not line or '-' not in line:
         return False
-    return all(c in '|-: 	' for c in line)
+    return TABLE_SEP_RE.fullmatch(line) is not None
 
 
 def is_table_row(line):
@@ -45,31 +131,55 @@ def is_table_row(line):
     return False
 
 
+QN_P = qn('w:p')
+QN_TCPR = qn('w:tcPr')
+
+
+def iter_new_table_rows(table):
+    """逐行返回新建表格的 (行, 单元格列表)
+    新建表格没有合并单元格，直接按 <w:tr>/<w:tc> 包装，
+    跳过 row.cells 对 vMerge/gridSpan 的逐格检查。
+    """
+    for tr in table._tbl.tr_lst:
+        yield _Row(tr, table), [_Cell(tc, table) for tc in tr.tc_lst]
+
+
+def set_cell_text(cell, text):
+    """写入单元格文本
+
+    新建表格的单元格只含一个空 <w:p>，直接在其中追加 run；
+    其余情况按 cell.text 清空内容后重建段落。
+    """
+    tc = cell._tc
+    p = tc[-1]
+    if (p.tag == QN_P and len(p) == 0
+            and (len(tc) == 1 or (len(tc) == 2 and tc[0].tag == QN_TCPR))):
+        p.add_r().text = text
+    else:
+        cell.text = text
+
+
+def format_empty_cell(cell, line_spacing):
+    """设置无数据单元格的段落行距与段前段后间距"""
+    for paragraph in cell.paragraphs:
+        pf = paragraph.paragraph_format
+        pf.line_spacing = line_spacing
+        pf.space_before = Pt(2)
+        pf.space_after = Pt(2)
+
+
 def create_word_table(doc, table_lines):
     """从Markdown表格行创建Word表格"""
 
     if len(table_lines) < 2:
         return
 
-    # 解析表格数据
-    rows_data = []
-    header_row = None
-
-    for i, line in enumerate(table_lines):
-        # 跳过分隔行（包含横线的行）
-        if is_separator_line(line):
-            continue
-
-        # 解析单元格
-        cells = parse_table_row(line)
-        if cells:
-            if header_row is None:
-                header_row = cells
-            else:
-                rows_data.append(cells)
-
-    if not header_row:
+    # 解析表格数据（整块一次解析，跳过分隔行）
+    rows = parse_table_block(table_lines)
+    if not rows:
         return
+    header_row = rows[0]
+    rows_data = rows[1:]
 
     # 确定列数
     max_cols = len(header_row)
@@ -83,13 +193,9 @@ def create_word_table(doc, table_lines):
     # 获取表格配置
     config = get_config()
     table_config = config.get('table', {})
-    border_enabled = table_config.get('border_enabled', True)
-    border_color = table_config.get('border_color', '#000000')
-    border_width = table_config.get('border_width', 4)
     row_height_cm = table_config.get('row_height_cm', 0.8)
     alignment_str = table_config.get('alignment', 'center')
     line_spacing = table_config.get('line_spacing', 1.2)
-    cell_margin = table_config.get('cell_margin', {})
     vertical_align_str = table_config.get('vertical_align', 'center')
 
     # 设置表格对齐方式
@@ -109,198 +215,167 @@ def create_word_table(doc, table_lines):
     vertical_align = vertical_align_map.get(vertical_align_str.lower(), WD_ALIGN_VERTICAL.CENTER)
 
     # 统一设置边框和内边距、行高等
-    if border_enabled:
-        try:
-            tbl = table._tbl
-            color = border_color.lstrip('#')
-            borders_xml = f'''
-            <w:tblBorders xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
-                <w:top w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-                <w:left w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-                <w:bottom w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-                <w:right w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-                <w:insideH w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-                <w:insideV w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-            </w:tblBorders>
-            '''
-            tbl.tblPr.append(parse_xml(borders_xml))
-        except Exception:
-            pass
+    apply_table_style(table, table_config)
 
-    try:
-        tbl = table._tbl
-        top = cell_margin.get('top', 30)
-        bottom = cell_margin.get('bottom', 30)
-        left = cell_margin.get('left', 60)
-        right = cell_margin.get('right', 60)
-        cell_margins_xml = f'''
-        <w:tblCellMar xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
-            <w:top w:w="{top}" w:type="dxa"/>
-            <w:left w:w="{left}" w:type="dxa"/>
-            <w:bottom w:w="{bottom}" w:type="dxa"/>
-            <w:right w:w="{right}" w:type="dxa"/>
-        </w:tblCellMar>
-        '''
-        tbl.tblPr.append(parse_xml(cell_margins_xml))
-    except Exception:
-        pass
+    # 表头/表体 run 格式与纯文本单元格格式每个表格只解析一次
+    header_format = resolve_table_run_format(config, is_header=True)
+    body_format = resolve_table_run_format(config, is_header=False)
+    header_cell_format = resolve_table_cell_format(config, is_header=True)
+    body_cell_format = resolve_table_cell_format(config, is_header=False)
 
-    # 行高与段落行距统一
-    try:
-        for row in table.rows:
-            row.height = Cm(row_height_cm)
-            for cell in row.cells:
-                cell.vertical_alignment = vertical_align
-                for paragraph in cell.paragraphs:
-                    pf = paragraph.paragraph_format
-                    pf.line_spacing = line_spacing
-                    pf.space_before = Pt(2)
-                    pf.space_after = Pt(2)
-    except Exception:
-        pass
+    # 导入 convert_quotes_to_chinese 避免循环导入
+    from formatter import convert_quotes_to_chinese
 
-    # 填充标题行
-    header_cells = table.rows[0].cells
-    for j, cell_text in enumerate(header_row):
-        if j < len(header_cells):
-            cell = header_cells[j]
+    # 单次遍历：设置行高和单元格对齐并填充标题行、数据行
+    # （写入单元格文本会重建段落，段落行距只需对无数据的单元格设置）
+    for i, (row, cells) in enumerate(iter_new_table_rows(table)):
+        is_header = (i == 0)
+        row_texts = header_row if is_header else rows_data[i - 1]
+        run_format = header_format if is_header else body_format
+        cell_format = header_cell_format if is_header else body_cell_format
+        try:
+            row.height = Cm(row_height_cm)
+        except Exception:
+            pass
+        for j, cell in enumerate(cells):
+            cell.vertical_alignment = vertical_align
+            if j >= len(row_texts):
+                format_empty_cell(cell, line_spacing)
+                continue
+            cell_text = row_texts[j]
             # 处理表格单元格中的格式
-            if contains_markdown_formatting(cell_text.strip()):
-                parse_table_cell_formatting(cell, cell_text.strip(), is_header=True)
+            if contains_markdown_formatting(cell_text):
+                parse_table_cell_formatting(cell, cell_text, is_header=is_header, run_format=run_format)
             else:
-                # 导入 convert_quotes_to_chinese 避免循环导入
-                from formatter import convert_quotes_to_chinese
-                cell.text = convert_quotes_to_chinese(cell_text.strip())
-                set_table_cell_format(cell, is_header=True)
-
-    # 填充数据行
-    for i, row_data in enumerate(rows_data):
-        if i + 1 < len(table.rows):
-            row_cells = table.rows[i + 1].cells
-            for j, cell_text in enumerate(row_data):
-                if j < len(row_cells):
-                    cell = row_cells[j]
-                    # 处理表格单元格中的格式
-                    if contains_markdown_formatting(cell_text.strip()):
-                        parse_table_cell_formatting(cell, cell_text.strip(), is_header=False)
-                    else:
-                        # 导入 convert_quotes_to_chinese 避免循环导入
-                        from formatter import convert_quotes_to_chinese
-                        cell.text = convert_quotes_to_chinese(cell_text.strip())
-                        set_table_cell_format(cell, is_header=False)
+                set_cell_text(cell, convert_quotes_to_chinese(cell_text))
+                set_table_cell_format(cell, is_header=is_header, cell_format=cell_format)
 
     # 调整列宽
     adjust_table_column_width(table)
 
 
+def _split_table_row(line):
+    """切分已去除首尾空白的非空表格行，返回去除空白后的单元格列表"""
+    # 移除开头和结尾的 |
+    start = 1 if line[0] == '|' else 0
+    end = len(line) - 1 if line[-1] == '|' and len(line) > start else len(line)
+    return list(map(str.strip, line[start:end].split('|')))
+
+
 def parse_table_row(line):
     """解析表格行，提取单元格内容"""
     if not line or not line.strip():
         return []
+    return _split_table_row(line.strip())
 
-    line = line.strip()
-
-    # 移除开头和结尾的 |
-    if line.startswith('|'):
-        line = line[1:]
-    if line.endswith('|'):
-        line = line[:-1]
-
-    # 分割单元格
-    cells = [cell.strip() for cell in line.split('|')]
 
-    # 过滤掉空单元格（但保留有意义的空单元格）
-    return cells
+def parse_table_block(table_lines):
+    """一次解析整个 Markdown 表格块，返回各行单元格列表（跳过分隔行和空行）"""
+    rows = []
+    for line in table_lines:
+        line = line.strip()
+        if line and not is_separator_line(line):
+            rows.append(_split_table_row(line))
+    return rows
 
 
 def contains_markdown_formatting(text):
     """检查文本是否包含Markdown格式标记"""
-    format_patterns = [
-        r'\*\*\*.*?\*\*\*',  # 加粗斜体
-        r'\*\*.*?\*\*',      # 加粗
-        r'\*.*?\*',          # 斜体
-        r'___.*?___',        # 加粗斜体
-        r'__.*?__',          # 加粗
-        r'_.*?_',            # 斜体
-        r'<u>.*?</u>',       # 下划线
-        r'~~.*?~~',          # 删除线
-        r'`.*?`',            # 行内代码
-        r'<br\s*/?>',       # 换行标签
-        r'\$.*?\$',         # LaTeX数学公式
-    ]
-
-    for pattern in format_patterns:
-        if re.search(pattern, text):
-            return True
-    return False
+    # 快速路径：不含任何标记字符的单元格无需正则匹配
+    if not CELL_MARKER_RE.search(text):
+        return False
+    return CELL_FORMAT_RE.search(text) is not None
 
 
-def parse_table_cell_formatting(cell, text, is_header=False):
-    """解析表格单元格中的格式化文本"""
+def parse_table_cell_formatting(cell, text, is_header=False, run_format=None):
+    """解析表格单元格中的格式化文本
+
+    run_format 为预先解析的 TableRunFormat，缺省时按 is_header 从配置解析。
+    """
+    if run_format is None:
+        run_format = resolve_table_run_format(get_config(), is_header)
+
     # 清空单元格
-    cell.text = ""
+    set_cell_text(cell, "")
 
     # 导入 convert_quotes_to_chinese 和 parse_formatted_text 避免循环导入
-    from formatter import convert_quotes_to_chinese, parse_formatted_text
+    from formatter import (
+        convert_quotes_to_chinese, parse_formatted_text, INLINE_FORMAT_PATTERNS, split_br,
+    )
 
     # 转换引号
     text = convert_quotes_to_chinese(text)
 
     # 支持<br>换行：拆分后逐段处理
-    parts_by_br = re.split(r'<br\s*/?>', text, flags=re.IGNORECASE)
-
-    # 解析格式
-    format_patterns = [
-        (r'\*\*\*(.*?)\*\*\*', {'bold': True, 'italic': True}),
-        (r'___(.*?)___', {'bold': True, 'italic': True}),
-        (r'\*\*(.*?)\*\*', {'bold': True}),
-        (r'__(.*?)__', {'bold': True}),
-        (r'(?<!\*)\*([^*\n]+?)\*(?!\*)', {'italic': True}),
-        (r'(?<!_)_([^_\n]+?)_(?!_)', {'italic': True}),
-        (r'<u>(.*?)</u>', {'underline': True}),
-        (r'~~(.*?)~~', {'strikethrough': True}),
-        (r'`([^`\n]+)`', {'code': True}),
-        (r'\$([^$\n]+?)\$', {'math': True}),  # LaTeX数学公式支持
-    ]
+    parts_by_br = split_br(text)
+    paragraph = cell.paragraphs[0]
 
     for idx, segment in enumerate(parts_by_br):
         if idx > 0:
-            cell.paragraphs[0].add_run().add_break()
-        text_parts = parse_formatted_text(segment, format_patterns)
+            paragraph.add_run().add_break()
+        text_parts = parse_formatted_text(segment, INLINE_FORMAT_PATTERNS)
         for part_text, formats in text_parts:
             if part_text:  # 只有非空文本才创建run
-                run = cell.paragraphs[0].add_run(part_text)
-                set_table_run_format(run, formats, is_header)
+                run = paragraph.add_run(part_text)
+                set_table_run_format(run, formats, run_format)
 
 
-def set_table_run_format(run, formats, is_header=False):
-    """设置表格单元格run格式"""
-    config = get_config()
+# 表格单元格 run 的已解析格式（每个表格按表头/表体各解析一次）
+TableRunFormat = namedtuple('TableRunFormat', [
+    'size', 'rgb', 'bold',
+    'code_font', 'code_rgb',
+    'math_font', 'math_size', 'math_italic', 'math_rgb',
+])
 
+
+def resolve_table_run_format(config, is_header=False):
+    """从配置解析表头/表体单元格 run 的字号、颜色等格式"""
     if is_header:
         header_config = config.get('table.header', {})
-        font_name = header_config.get('font', 'Times New Roman')
         font_size = header_config.get('size', 10.5)
         color_hex = header_config.get('color', '#000000')
         bold = header_config.get('bold', True)
     else:
         body_config = config.get('table.body', {})
-        font_name = body_config.get('font', '仿宋_GB2312')
         font_size = body_config.get('size', 10.5)
         color_hex = body_config.get('color', '#000000')
         bold = False
 
+    code_config = config.get('inline_code', {})
+    math_config = config.get('math', {})
+    return TableRunFormat(
+        size=Pt(font_size),
+        rgb=hex_to_rgb(color_hex),
+        bold=bold,
+        code_font=code_config.get('font', 'Times New Roman'),
+        code_rgb=hex_to_rgb(code_config.get('color', '#333333')),
+        math_font=math_config.get('font', 'Times New Roman'),
+        math_size=Pt(math_config.get('size', 10)),
+        math_italic=math_config.get('italic', True),
+        math_rgb=hex_to_rgb(math_config.get('color', '#00008B')),
+    )
+
+
+def set_table_run_format(run, formats, run_format):
+    """设置表格单元格run格式
+
+    Args:
+        run: 文本 run
+        formats: Markdown 格式标记
+        run_format: resolve_table_run_format 解析出的 TableRunFormat
+    """
     font = run.font
     font.name = 'Times New Roman'  # 默认英文字体
-    font.size = Pt(font_size)
-    font.color.rgb = hex_to_rgb(color_hex)
-    font.bold = bold if is_header else False
+    font.size = run_format.size
+    font.color.rgb = run_format.rgb
+    font.bold = run_format.bold
 
     # 设置字体映射：英文和数字用Times New Roman，中文用仿宋_GB2312
-    run._element.rPr.rFonts.set(qn('w:ascii'), 'Times New Roman')
-    run._element.rPr.rFonts.set(qn('w:hAnsi'), 'Times New Roman')
-    run._element.rPr.rFonts.set(qn('w:eastAsia'), '仿宋_GB2312')
-    run._element.rPr.rFonts.set(qn('w:cs'), 'Times New Roman')
+    r_fonts = run._element.rPr.rFonts
+    r_fonts.set(QN_ASCII, 'Times New Roman')
+    r_fonts.set(QN_HANSI, 'Times New Roman')
+    r_fonts.set(QN_EASTASIA, '仿宋_GB2312')
+    r_fonts.set(QN_CS, 'Times New Roman')
 
     # 应用Markdown格式
     if formats.get('bold', False):
@@ -313,33 +388,32 @@ def set_table_run_format(run, formats, is_header=False):
         font.strike = True
     if formats.get('code', False):
         # 表格中代码使用Times New Roman，稍小字号
-        code_config = config.get('inline_code', {})
-        font.name = code_config.get('font', 'Times New Roman')
+        font.name = run_format.code_font
         font.size = Pt(9)
-        font.color.rgb = hex_to_rgb(code_config.get('color', '#333333'))
-        run._element.rPr.rFonts.set(qn('w:ascii'), 'Times New Roman')
-        run._element.rPr.rFonts.set(qn('w:hAnsi'), 'Times New Roman')
-        run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Times New Roman')
+        font.color.rgb = run_format.code_rgb
+        r_fonts.set(QN_ASCII, 'Times New Roman')
+        r_fonts.set(QN_HANSI, 'Times New Roman')
+        r_fonts.set(QN_EASTASIA, 'Times New Roman')
         return
     if formats.get('math', False):
         # 表格中数学公式使用Times New Roman，斜体，深蓝色
-        math_config = config.get('math', {})
-        font.name = math_config.get('font', 'Times New Roman')
-        font.size = Pt(math_config.get('size', 10))
-        font.italic = math_config.get('italic', True)
-        font.color.rgb = hex_to_rgb(math_config.get('color', '#00008B'))
-        run._element.rPr.rFonts.set(qn('w:ascii'), 'Times New Roman')
-        run._element.rPr.rFonts.set(qn('w:hAnsi'), 'Times New Roman')
-        run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Times New Roman')
+        font.name = run_format.math_font
+        font.size = run_format.math_size
+        font.italic = run_format.math_italic
+        font.color.rgb = run_format.math_rgb
+        r_fonts.set(QN_ASCII, 'Times New Roman')
+        r_fonts.set(QN_HANSI, 'Times New Roman')
+        r_fonts.set(QN_EASTASIA, 'Times New Roman')
         return
 
 
-def set_table_cell_format(cell, is_header=False):
-    """设置表格单元格格式"""
-    config = get_config()
-    table_config = config.get('table', {})
-    line_spacing = table_config.get('line_spacing', 1.2)
+# 纯文本表格单元格的已解析格式（每个表格按表头/表体各解析一次）
+TableCellFormat = namedtuple('TableCellFormat', ['font_name', 'size', 'rgb', 'bold', 'line_spacing'])
+
 
+def resolve_table_cell_format(config, is_header=False):
+    """从配置解析纯文本表头/表体单元格的字体、字号、颜色与行距"""
+    line_spacing = config.get('table', {}).get('line_spacing', 1.2)
     if is_header:
         header_config = config.get('table.header', {})
         font_name = header_config.get('font', 'Times New Roman')
@@ -352,24 +426,69 @@ def set_table_cell_format(cell, is_header=False):
         font_size = body_config.get('size', 10.5)
         color_hex = body_config.get('color', '#000000')
         bold = False
+    return TableCellFormat(font_name, Pt(font_size), hex_to_rgb(color_hex), bold, line_spacing)
 
-    # 设置段落格式
-    for paragraph in cell.paragraphs:
-        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER  # 居中对齐
-        paragraph.paragraph_format.space_before = Pt(0)
-        paragraph.paragraph_format.space_after = Pt(0)
-        paragraph.paragraph_format.line_spacing = line_spacing
 
-        # 设置文字格式
-        for run in paragraph.runs:
-            font = run.font
-            font.name = font_name
-            font.size = Pt(font_size)
-            font.color.rgb = hex_to_rgb(color_hex)
-            font.bold = bold if is_header else False
+def _apply_cell_paragraph_format(paragraph_format, cell_format):
+    """设置单元格段落格式：居中、段前段后为 0、表格行距"""
+    paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER  # 居中对齐
+    paragraph_format.space_before = Pt(0)
+    paragraph_format.space_after = Pt(0)
+    paragraph_format.line_spacing = cell_format.line_spacing
+
+
+def _apply_cell_run_format(r, cell_format):
+    """设置单元格 run 的字体、字号、颜色、加粗及中文字体"""
+    font_name = cell_format.font_name
+    font = Font(r)
+    font.name = font_name
+    font.size = cell_format.size
+    font.color.rgb = cell_format.rgb
+    font.bold = cell_format.bold
+
+    # 设置中文字体
+    r.rPr.rFonts.set(QN_EASTASIA, font_name)
+
+
+# TableCellFormat -> (pPr 模板, rPr 模板)
+_CELL_FORMAT_TEMPLATES = {}
+
+
+def _get_cell_format_templates(cell_format):
+    """获取（必要时生成）单元格格式对应的 <w:pPr>、<w:rPr> 模板"""
+    templates = _CELL_FORMAT_TEMPLATES.get(cell_format)
+    if templates is None:
+        scratch = OxmlElement('w:p')
+        _apply_cell_paragraph_format(ParagraphFormat(scratch), cell_format)
+        r = scratch.add_r()
+        _apply_cell_run_format(r, cell_format)
+        templates = _CELL_FORMAT_TEMPLATES[cell_format] = (scratch.pPr, r.rPr)
+    return templates
 
-            # 设置中文字体
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
+
+def set_table_cell_format(cell, is_header=False, cell_format=None):
+    """设置表格单元格格式
+
+    cell_format 为预先解析的 TableCellFormat，缺省时按 is_header 从配置解析。
+    尚无 pPr / rPr 的段落和 run（新写入的单元格）直接插入缓存模板的副本，其余逐项设置。
+    """
+    if cell_format is None:
+        cell_format = resolve_table_cell_format(get_config(), is_header)
+    ppr_template, rpr_template = _get_cell_format_templates(cell_format)
+
+    for p in cell._tc.p_lst:
+        # 设置段落格式
+        if p.pPr is None:
+            p.insert(0, deepcopy(ppr_template))
+        else:
+            _apply_cell_paragraph_format(ParagraphFormat(p), cell_format)
+
+        # 设置文字格式
+        for r in p.r_lst:
+            if r.rPr is None:
+                r.insert(0, deepcopy(rpr_template))
+            else:
+                _apply_cell_run_format(r, cell_format)
 
 
 def adjust_table_column_width(table):
@@ -378,35 +497,93 @@ def adjust_table_column_width(table):
         # 获取表格总宽度（页面宽度减去页边距）
         available_width = Cm(21.0 - 3.18 * 2)  # A4宽度减去左右页边距
 
-        # 平均分配列宽
-        col_count = len(table.columns)
+        # 平均分配列宽：一次取出 <w:gridCol> 列表直接写入宽度，不再两次构造 table.columns
+        grid_cols = table._tbl.tblGrid.gridCol_lst
+        col_count = len(grid_cols)
         if col_count > 0:
             col_width = int(available_width / col_count)  # 转换为整数
-            for column in table.columns:
-                column.width = col_width
+            for grid_col in grid_cols:
+                grid_col.w = col_width
     except Exception as e:
         print(f"⚠️  表格列宽调整失败: {e}")
 
 
+class HTMLTableParser(HTMLParser):
+    """流式提取首个 <table> 中各行单元格文本（单元格内各段文本去空白后拼接）
+
+    未闭合的 <tr>/<td>/<th> 在遇到下一个同类标签或所在行、表格结束时自动闭合。
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = None  # 遇到首个 <table> 后为行列表
+        self._table_depth = 0
+        self._done = False
+        self._row = None
+        self._cell = None
+
+    def _finish_cell(self):
+        if self._cell is not None:
+            self._row.append(''.join(self._cell))
+            self._cell = None
+
+    def _finish_row(self):
+        self._finish_cell()
+        if self._row:  # 只添加非空行
+            self.rows.append(self._row)
+        self._row = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        if tag == 'table':
+            if self.rows is None:
+                self.rows = []
+            self._table_depth += 1
+        elif self._table_depth == 0:
+            return
+        elif tag == 'tr':
+            self._finish_row()
+            self._row = []
+        elif tag in ('td', 'th') and self._row is not None:
+            self._finish_cell()
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if self._done or self._table_depth == 0:
+            return
+        if tag in ('td', 'th'):
+            if self._row is not None:
+                self._finish_cell()
+        elif tag == 'tr':
+            if self._row is not None:
+                self._finish_row()
+        elif tag == 'table':
+            self._table_depth -= 1
+            if self._table_depth == 0:
+                if self._row is not None:
+                    self._finish_row()
+                self._done = True
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            text = data.strip()
+            if text:
+                self._cell.append(text)
+
+    def close(self):
+        super().close()
+        if self._row is not None:
+            self._finish_row()
+
+
 def parse_html_table(html_content):
     """解析HTML表格内容，返回表格数据"""
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        table = soup.find('table')
-        if not table:
-            return None
-
-        rows_data = []
-        for tr in table.find_all('tr'):
-            row_cells = []
-            for cell in tr.find_all(['td', 'th']):
-                # 获取单元格文本内容，保留基本格式
-                cell_text = cell.get_text(strip=True)
-                row_cells.append(cell_text)
-            if row_cells:  # 只添加非空行
-                rows_data.append(row_cells)
-
-        return rows_data
+        parser = HTMLTableParser()
+        parser.feed(html_content)
+        parser.close()
+        return parser.rows
     except Exception as e:
         print(f"⚠️  HTML表格解析失败: {e}")
         return None
@@ -425,12 +602,8 @@ def create_word_table_from_html(doc, html_content):
     # 获取表格配置
     config = get_config()
     table_config = config.get('table', {})
-    border_enabled = table_config.get('border_enabled', True)
-    border_color = table_config.get('border_color', '#000000')
-    border_width = table_config.get('border_width', 4)
     row_height_cm = table_config.get('row_height_cm', 0.8)
     line_spacing = table_config.get('line_spacing', 1.2)
-    cell_margin = table_config.get('cell_margin', {})
     vertical_align_str = table_config.get('vertical_align', 'center')
 
     # 创建Word表格
@@ -454,74 +627,38 @@ def create_word_table_from_html(doc, html_content):
     vertical_align = vertical_align_map.get(vertical_align_str.lower(), WD_ALIGN_VERTICAL.CENTER)
 
     # 设置表格边框和单元格边距
-    if border_enabled:
+    apply_table_style(table, table_config)
+
+    # 表头/表体单元格格式每个表格只解析一次
+    header_cell_format = resolve_table_cell_format(config, is_header=True)
+    body_cell_format = resolve_table_cell_format(config, is_header=False)
+
+    # 单次遍历：设置行高和单元格对齐并填充数据
+    # （写入 cell.text 会重建段落，之前设置的段落格式会被丢弃，因此只对无数据的单元格设置）
+    for i, (row, cells) in enumerate(iter_new_table_rows(table)):
+        row_data = rows_data[i]
+        is_header = (i == 0)  # 第一行作为标题行处理
+        cell_format = header_cell_format if is_header else body_cell_format
         try:
-            tbl = table._tbl
-            color = border_color.lstrip('#')
-            borders_xml = f'''
-            <w:tblBorders xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
-                <w:top w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-                <w:left w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-                <w:bottom w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-                <w:right w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-                <w:insideH w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-                <w:insideV w:val="single" w:sz="{border_width}" w:space="0" w:color="{color}"/>
-            </w:tblBorders>
-            '''
-            tbl.tblPr.append(parse_xml(borders_xml))
+            row.height = Cm(row_height_cm)
         except Exception:
             pass
-
-    try:
-        tbl = table._tbl
-        top = cell_margin.get('top', 30)
-        bottom = cell_margin.get('bottom', 30)
-        left = cell_margin.get('left', 60)
-        right = cell_margin.get('right', 60)
-        cell_margins_xml = f'''
-        <w:tblCellMar xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
-            <w:top w:w="{top}" w:type="dxa"/>
-            <w:left w:w="{left}" w:type="dxa"/>
-            <w:bottom w:w="{bottom}" w:type="dxa"/>
-            <w:right w:w="{right}" w:type="dxa"/>
-        </w:tblCellMar>
-        '''
-        tbl.tblPr.append(parse_xml(cell_margins_xml))
-    except Exception:
-        pass
-
-    # 设置行高和单元格对齐
-    try:
-        for row in table.rows:
-            row.height = Cm(row_height_cm)
-            for cell in row.cells:
-                cell.vertical_alignment = vertical_align
-                for paragraph in cell.paragraphs:
-                    pf = paragraph.paragraph_format
-                    pf.line_spacing = line_spacing
-                    pf.space_before = Pt(2)
-                    pf.space_after = Pt(2)
-    except Exception:
-        pass
-
-    # 填充表格数据
-    for i, row_data in enumerate(rows_data):
-        if i < len(table.rows):
-            row_cells = table.rows[i].cells
-            for j, cell_text in enumerate(row_cells):
-                if j < len(row_cells):
-                    cell = row_cells[j]
-                    cell.text = convert_quotes_to_chinese(cell_text.strip())
-                    # 第一行作为标题行处理
-                    set_table_cell_format(cell, is_header=(i == 0))
+        for j, cell in enumerate(cells):
+            cell.vertical_alignment = vertical_align
+            if j < len(row_data):
+                set_cell_text(cell, convert_quotes_to_chinese(row_data[j].strip()))
+                set_table_cell_format(cell, is_header=is_header, cell_format=cell_format)
+            else:
+                format_empty_cell(cell, line_spacing)
 
     # 调整列宽
     adjust_table_column_width(table)
     print(f"✅ 处理HTML表格: {len(rows_data)} 行")
 
 
+@lru_cache(maxsize=64)
 def hex_to_rgb(hex_color: str):
-    """将十六进制颜色转换为 RGBColor"""
+    """将十六进制颜色转换为 RGBColor（RGBColor 不可变，结果可安全复用）"""
     from docx.shared import RGBColor
     hex_color = hex_color.lstrip('#')
     if len(hex_color) == 6:
@@ -7,12 +7,60 @@ import os
 import json
 from pathlib import Path
 from typing import Dict, List, Set, Optional
-from collections import defaultdict
+
+# 遍历时整体跳过的目录（与搜索、质量分析共用）
+try:
+    from .common import EXCLUDE_DIRS
+except ImportError:
+    # 直接运行脚本时
+    from common import EXCLUDE_DIRS
 
 
 class ArchitectureAnalyzer:
     """仓库架构分析器"""
 
+    # 入口文件名 -> 说明
+    ENTRY_PATTERNS = {
+        'package.json': 'Node.js 应用入口',
+        'pyproject.toml': 'Python 项目配置',
+        'requirements.txt': 'Python 依赖文件',
+        'setup.py': 'Python 安装脚本',
+        'main.py': 'Python 主入口',
+        'app.py': 'Python 应用入口',
+        'index.js': 'Node.js 入口',
+        'main.go': 'Go 主入口',
+        'main.rs': 'Rust 主入口',
+        'lib.rs': 'Rust 库入口',
+        'Cargo.toml': 'Rust 项目配置',
+        'go.mod': 'Go 模块配置',
+        'pom.xml': 'Java Maven 项目',
+        'build.gradle': 'Java Gradle 项目',
+        'index.html': 'Web 应用入口',
+        'next.config.js': 'Next.js 配置',
+        'vite.config.js': 'Vite 配置',
+    }
+
+    # 配置文件名 -> 配置类型
+    CONFIG_TYPES = {
+        '.eslintrc': '代码规范',
+        '.eslintrc.js': '代码规范',
+        '.eslintrc.json': '代码规范',
+        '.eslintrc.yaml': '代码规范',
+        '.prettierrc': '代码格式化',
+        '.prettierrc.js': '代码格式化',
+        '.prettierrc.json': '代码格式化',
+        'tsconfig.json': 'TypeScript/JavaScript 配置',
+        'jsconfig.json': 'TypeScript/JavaScript 配置',
+        '.github': 'CI/CD 配置',  # GitHub Actions 配置目录
+        'docker-compose.yml': '容器配置',
+        'Dockerfile': '容器配置',
+        '.env.example': '环境配置',
+        '.env.sample': '环境配置',
+    }
+
+    # MVC 目录名
+    MVC_INDICATORS = {'controllers', 'models', 'views', 'routes'}
+
     def __init__(self, repo_path: str):
         """初始化分析器
 
@@ -22,20 +70,25 @@ class ArchitectureAnalyzer:
         self.repo_path = Path(repo_path)
         if not self.repo_path.exists():
             raise ValueError(f"仓库路径不存在: {repo_path}")
+        self._root_str = str(self.repo_path)
+        self._scan_cache = None
+        self._analysis_cache = None
 
     def analyze(self) -> Dict:
         """执行完整架构分析
 
         Returns:
-            架构分析结果
+            架构分析结果（缓存在实例上，generate_report() 等重复调用不再重新扫描）
         """
-        return {
-            'directory_structure': self._analyze_directory_structure(),
-            'entry_points': self._find_entry_points(),
-            'modules': self._identify_modules(),
-            'config_files': self._find_config_files(),
-            'patterns': self._detect_patterns(),
-        }
+        if self._analysis_cache is None:
+            self._analysis_cache = {
+                'directory_structure': self._analyze_directory_structure(),
+                'entry_points': self._find_entry_points(),
+                'modules': self._identify_modules(),
+                'config_files': self._find_config_files(),
+                'patterns': self._detect_patterns(),
+            }
+        return self._analysis_cache
 
     def _analyze_directory_structure(self) -> Dict:
         """分析目录结构"""
@@ -48,190 +101,161 @@ class ArchitectureAnalyzer:
 
         max_depth = 0
         root_items = []
-        exclude_dirs = {'.git', 'node_modules', '__pycache__', 'venv', '.venv', 'dist', 'build', 'target'}
 
-        for item in self.repo_path.iterdir():
-            if item.name in exclude_dirs:
-                continue
-
-            if item.is_dir():
-                structure['total_dirs'] += 1
-                depth = self._get_depth(item)
-                max_depth = max(max_depth, depth)
-            else:
-                structure['total_files'] += 1
+        with os.scandir(self.repo_path) as it:
+            for entry in it:
+                if entry.name in EXCLUDE_DIRS:
+                    continue
 
-            root_items.append({
-                'name': item.name,
-                'type': 'dir' if item.is_dir() else 'file',
-            })
+                is_dir = entry.is_dir()
+                if is_dir:
+                    structure['total_dirs'] += 1
+                    depth = self._get_depth(entry.path)
+                    max_depth = max(max_depth, depth)
+                else:
+                    structure['total_files'] += 1
+
+                root_items.append({
+                    'name': entry.name,
+                    'type': 'dir' if is_dir else 'file',
+                })
 
         structure['root'] = root_items
         structure['depth'] = max_depth
 
         return structure
 
-    def _get_depth(self, path: Path) -> int:
-        """获取目录深度"""
-        try:
-            relative = path.relative_to(self.repo_path)
-            return len(relative.parts)
-        except ValueError:
+    def _get_depth(self, path: str) -> int:
+        """获取目录深度（path 为字符串路径，按分隔符计数，不做路径解析）"""
+        root = self._root_str
+        if not path.startswith(root):
             return 0
+        tail = path[len(root):].strip(os.sep)
+        return tail.count(os.sep) + 1 if tail else 0
 
-    def _find_entry_points(self) -> List[Dict]:
-        """查找入口文件"""
-        entry_points = []
-        entry_patterns = {
-            'package.json': 'Node.js 应用入口',
-            'pyproject.toml': 'Python 项目配置',
-            'requirements.txt': 'Python 依赖文件',
-            'setup.py': 'Python 安装脚本',
-            'main.py': 'Python 主入口',
-            'app.py': 'Python 应用入口',
-            'index.js': 'Node.js 入口',
-            'main.go': 'Go 主入口',
-            'main.rs': 'Rust 主入口',
-            'lib.rs': 'Rust 库入口',
-            'Cargo.toml': 'Rust 项目配置',
-            'go.mod': 'Go 模块配置',
-            'pom.xml': 'Java Maven 项目',
-            'build.gradle': 'Java Gradle 项目',
-            'index.html': 'Web 应用入口',
-            'next.config.js': 'Next.js 配置',
-            'vite.config.js': 'Vite 配置',
-        }
-
-        for pattern, description in entry_patterns.items():
-            matches = list(self.repo_path.rglob(pattern))
-            for match in matches:
-                # 排除 node_modules 等
-                if any(exc in match.parts for exc in ['node_modules', '__pycache__', '.git']):
-                    continue
-
-                entry_points.append({
-                    'file': str(match.relative_to(self.repo_path)),
-                    'type': description,
-                })
-
-        return entry_points
-
-    def _identify_modules(self) -> List[Dict]:
-        """识别模块/包结构"""
-        modules = []
-        exclude_dirs = {'.git', 'node_modules', '__pycache__', 'venv', '.venv', 'dist', 'build'}
-
-        # Python 模块
-        for init_file in self.repo_path.rglob('__init__.py'):
-            if any(exc in init_file.parts for exc in exclude_dirs):
-                continue
-
-            module_path = init_file.parent.relative_to(self.repo_path)
-            modules.append({
-                'name': str(module_path),
-                'type': 'python_package',
-                'file': str(module_path / '__init__.py'),
-            })
+    def _scan_once(self) -> Dict:
+        """单次遍历仓库，同时收集入口文件、模块、配置文件，以及目录名与根目录条目（用于模式检测）
 
-        # JavaScript/TypeScript 模块
-        for pkg_dir in self.repo_path.rglob('node_modules'):
-            continue  # 跳过 node_modules
+        基于 os.scandir 的显式栈遍历，直接比较条目名，只在命中时拼接相对路径。
+        排除目录（.git、node_modules、venv 等）在下降时直接剪枝，不进入其子树。
 
-        # 查找 src 目录
-        for src_dir in self.repo_path.rglob('src'):
-            if any(exc in src_dir.parts for exc in exclude_dirs):
-                continue
-
-            modules.append({
-                'name': str(src_dir.relative_to(self.repo_path)),
-                'type': 'source_directory',
-            })
-
-        # 查找 lib 目录
-        for lib_dir in self.repo_path.rglob('lib'):
-            if any(exc in lib_dir.parts for exc in exclude_dirs):
+        Returns:
+            扫描结果（缓存在实例上，各 _find_* 方法共用）
+        """
+        if self._scan_cache is not None:
+            return self._scan_cache
+
+        entry_hits = {name: [] for name in self.ENTRY_PATTERNS}
+        config_hits = {name: [] for name in self.CONFIG_TYPES}
+        packages, src_dirs, lib_dirs = [], [], []
+        dir_names = set()
+        top_level = set()
+
+        # 显式栈深度优先遍历：(目录路径, 相对路径前缀)
+        stack = [(self._root_str, '')]
+        while stack:
+            dir_path, prefix = stack.pop()
+            rel_dir = prefix.rstrip(os.sep) or '.'
+            subdirs = []
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        name = entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            if name in EXCLUDE_DIRS:
+                                continue
+                            dir_names.add(name)
+                            subdirs.append((entry.path, prefix + name + os.sep))
+                        if not prefix:
+                            top_level.add(name)
+
+                        # 入口文件 / 配置文件按文件名查表，只在命中时才拼接相对路径
+                        if name in entry_hits:
+                            entry_hits[name].append(prefix + name)
+                        if name in config_hits:
+                            config_hits[name].append(prefix + name)
+
+                        if name == '__init__.py':
+                            packages.append({
+                                'name': rel_dir,
+                                'type': 'python_package',
+                                'file': prefix + name,
+                            })
+                        elif name == 'src':
+                            src_dirs.append({'name': prefix + name, 'type': 'source_directory'})
+                        elif name == 'lib':
+                            lib_dirs.append({'name': prefix + name, 'type': 'library_directory'})
+            except OSError:
                 continue
+            # 逆序入栈，保持与自顶向下遍历相同的访问顺序
+            stack.extend(reversed(subdirs))
+
+        # 配置文件直接按类型归组，报告生成时无需再二次分组
+        config_by_type = {}
+        for name, config_type in self.CONFIG_TYPES.items():
+            if config_hits[name]:
+                config_by_type.setdefault(config_type, []).extend(config_hits[name])
+
+        self._scan_cache = {
+            'entry_points': [
+                {'file': path, 'type': description}
+                for name, description in self.ENTRY_PATTERNS.items()
+                for path in entry_hits[name]
+            ],
+            'modules': packages + src_dirs + lib_dirs,
+            'config_files': [
+                {'file': path, 'type': config_type}
+                for config_type, files in config_by_type.items()
+                for path in files
+            ],
+            'config_files_by_type': config_by_type,
+            'mvc': not self.MVC_INDICATORS.isdisjoint(dir_names),
+            'top_level': top_level,
+        }
+        return self._scan_cache
 
-            modules.append({
-                'name': str(lib_dir.relative_to(self.repo_path)),
-                'type': 'library_directory',
-            })
+    def _find_entry_points(self) -> List[Dict]:
+        """查找入口文件"""
+        return self._scan_once()['entry_points']
 
-        return modules
+    def _identify_modules(self) -> List[Dict]:
+        """识别模块/包结构（Python 包、src 目录、lib 目录）"""
+        return self._scan_once()['modules']
 
     def _find_config_files(self) -> List[Dict]:
         """查找配置文件"""
-        config_files = []
-        config_patterns = [
-            '.eslintrc', '.eslintrc.js', '.eslintrc.json', '.eslintrc.yaml',
-            '.prettierrc', '.prettierrc.js', '.prettierrc.json',
-            'tsconfig.json', 'jsconfig.json',
-            '.github',  # GitHub Actions 配置目录
-            'docker-compose.yml', 'Dockerfile',
-            '.env.example', '.env.sample',
-        ]
-
-        for pattern in config_patterns:
-            if '*' in pattern:
-                continue
-
-            matches = list(self.repo_path.rglob(pattern))
-            for match in matches:
-                if any(exc in match.parts for exc in ['node_modules', '.git']):
-                    continue
-
-                config_files.append({
-                    'file': str(match.relative_to(self.repo_path)),
-                    'type': self._classify_config(match.name),
-                })
-
-        return config_files
-
-    def _classify_config(self, filename: str) -> str:
-        """分类配置文件类型"""
-        if 'eslint' in filename.lower():
-            return '代码规范'
-        elif 'prettier' in filename.lower():
-            return '代码格式化'
-        elif 'tsconfig' in filename.lower() or 'jsconfig' in filename.lower():
-            return 'TypeScript/JavaScript 配置'
-        elif 'github' in filename.lower():
-            return 'CI/CD 配置'
-        elif 'docker' in filename.lower():
-            return '容器配置'
-        elif '.env' in filename.lower():
-            return '环境配置'
-        else:
-            return '其他配置'
+        return self._scan_once()['config_files']
 
     def _detect_patterns(self) -> List[Dict]:
         """检测架构模式"""
         patterns = []
+        scan = self._scan_once()
 
         # 检测 MVC 模式
-        mvc_indicators = ['controllers', 'models', 'views', 'routes']
-        if any(ind in str(p) for p in self.repo_path.rglob('*') for ind in mvc_indicators):
+        if scan['mvc']:
             patterns.append({
                 'name': 'MVC 架构',
                 'confidence': 'medium',
             })
 
+        top_level = scan['top_level']
+
         # 检测微服务模式
-        if any((self.repo_path / d).exists() for d in ['services', 'microservices']):
+        if not top_level.isdisjoint(('services', 'microservices')):
             patterns.append({
                 'name': '微服务架构',
                 'confidence': 'low',
             })
 
         # 检测插件模式
-        if any((self.repo_path / 'plugins').exists(), (self.repo_path / 'extensions').exists()):
+        if not top_level.isdisjoint(('plugins', 'extensions')):
             patterns.append({
                 'name': '插件架构',
                 'confidence': 'medium',
             })
 
         # 检测 monorepo 模式
-        if (self.repo_path / 'packages').exists() or (self.repo_path / 'apps').exists():
+        if not top_level.isdisjoint(('packages', 'apps')):
             patterns.append({
                 'name': 'Monorepo',
                 'confidence': 'high',
@@ -271,11 +295,7 @@ class ArchitectureAnalyzer:
 
         if analysis['config_files']:
             lines.append("\n## 配置文件")
-            by_type = defaultdict(list)
-            for cf in analysis['config_files']:
-                by_type[cf['type']].append(cf['file'])
-
-            for config_type, files in by_type.items():
+            for config_type, files in self._scan_once()['config_files_by_type'].items():
                 lines.append(f"\n### {config_type}")
                 for f in files[:5]:
                     lines.append(f"- `{f}`")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+公共工具 - 目录遍历与正则编译，供搜索与质量分析共用
+"""
+
+import os
+import re
+
+# 可选依赖：google-re2
+try:
+    import re2
+    HAS_RE2 = True
+except ImportError:
+    HAS_RE2 = False
+
+# 遍历时整体跳过的目录（依赖、虚拟环境、构建产物等）
+EXCLUDE_DIRS = frozenset({'.git', 'node_modules', '__pycache__',
+                          'venv', '.venv', 'dist', 'build', 'target'})
+
+
+def scandir_recursive(path: str):
+    """递归遍历目录，在下降时跳过排除目录，逐个产出文件的 os.DirEntry
+
+    无权限或遍历中途消失的目录直接跳过，不中断整个遍历。
+    """
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in EXCLUDE_DIRS:
+                        yield from scandir_recursive(entry.path)
+                elif entry.is_file():
+                    yield entry
+    except OSError:
+        return
+
+
+def compile_linear(pattern, flags: int = 0):
+    """编译正则：已安装 RE2 时用 RE2（线性时间匹配，不会回溯爆炸），否则回退到 re
+
+    RE2 不接受 re 的 flags 参数，IGNORECASE/MULTILINE 转为内联标志（str 与 bytes 模式均可）。
+    """
+    if not HAS_RE2:
+        return re.compile(pattern, flags)
+    inline = ''.join(c for flag, c in ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm')) if flags & flag)
+    if inline:
+        prefix = f'(?{inline})'
+        pattern = (prefix.encode() if isinstance(pattern, bytes) else prefix) + pattern
+    return re2.compile(pattern)
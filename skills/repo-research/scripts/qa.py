@@ -72,6 +72,19 @@ class QuestionClassifier:
         ],
     }
 
+    # 每个意图的模式合并为一个交替正则（忽略大小写），类加载时编译一次
+    INTENT_REGEXES = {
+        intent: re.compile('|'.join(patterns), re.IGNORECASE)
+        for intent, patterns in INTENT_PATTERNS.items()
+    }
+
+    # 功能关键词，及其一次扫描用的交替正则
+    FEATURE_KEYWORDS = ('登录', '认证', '支付', '导出', '导入', '搜索', '上传', '下载')
+    FEATURE_PATTERN = re.compile('|'.join(map(re.escape, FEATURE_KEYWORDS)))
+
+    # 组件名称（引号或反引号包裹）
+    COMPONENT_PATTERN = re.compile(r'[`"\']([^`"\']+)[`"\']')
+
     @classmethod
     def classify(cls, question: str) -> Question:
         """分类问题意图
@@ -82,15 +95,13 @@ class QuestionClassifier:
         Returns:
             解析后的问题对象
         """
-        question_lower = question.lower()
-
-        # 识别意图
+        # 识别意图：多个意图命中时，INTENT_PATTERNS 中靠后（更具体）的意图优先，
+        # 因此逆序检查、取第一个命中；overview 的宽泛关键词优先级最低
         intent = 'general'
-        for intent_name, patterns in cls.INTENT_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, question_lower):
-                    intent = intent_name
-                    break
+        for intent_name in reversed(cls.INTENT_REGEXES):
+            if cls.INTENT_REGEXES[intent_name].search(question):
+                intent = intent_name
+                break
 
         # 提取实体
         entities = cls._extract_entities(question)
@@ -115,15 +126,13 @@ class QuestionClassifier:
         }
 
         # 提取功能关键词
-        feature_keywords = ['登录', '认证', '支付', '导出', '导入', '搜索', '上传', '下载']
-        for kw in feature_keywords:
-            if kw in question:
-                entities['features'].append(kw)
+        found = set(QuestionClassifier.FEATURE_PATTERN.findall(question))
+        if found:
+            # 按关键词表顺序输出，每个关键词最多一次
+            entities['features'] = [kw for kw in QuestionClassifier.FEATURE_KEYWORDS if kw in found]
 
         # 提取组件名称（如果有引号或反引号）
-        component_pattern = r'[`"\']([^`"\']+)[`"\']'
-        matches = re.findall(component_pattern, question)
-        entities['components'].extend(matches)
+        entities['components'].extend(QuestionClassifier.COMPONENT_PATTERN.findall(question))
 
         return entities
 
@@ -188,18 +197,19 @@ class QATemplate:
 {examples}
 """
 
+    # README 中首个不以 # 开头的非空行
+    README_DESCRIPTION_PATTERN = re.compile(r'^(?!#)(.*\S.*)$', re.MULTILINE)
+
     @classmethod
     def format_overview(cls, repo_name: str, readme_content: str, package_info: Dict) -> str:
         """格式化项目概述回答"""
         # 简单提取 README 摘要
         description = "一个开源项目"
 
-        # 从 README 提取第一段
-        lines = readme_content.split('\n')
-        for line in lines:
-            if line.strip() and not line.startswith('#'):
-                description = line.strip()
-                break
+        # 从 README 提取第一段：正则直接定位首个非标题的非空行，无需拆分全文
+        match = cls.README_DESCRIPTION_PATTERN.search(readme_content)
+        if match:
+            description = match.group(1).strip()
 
         # 提取语言
         language = package_info.get('language', '未知')
@@ -3,40 +3,257 @@
 代码质量分析器 - 分析代码质量指标和潜在问题
 """
 
+import heapq
+import os
 import re
 from pathlib import Path
-from typing import Dict, List, Set
-from collections import defaultdict
+from typing import Dict, List, Tuple
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# 目录遍历与正则编译的公共实现
+try:
+    from .common import compile_linear, scandir_recursive
+except ImportError:
+    # 直接运行脚本时
+    from common import compile_linear, scandir_recursive
+
+# 代码统计中按注释计的行首前缀；注释分析中的单行注释前缀（按字节匹配）
+_COMMENT_PREFIXES = (b'#', b'//', b'/*', b'*')
+_LINE_COMMENT_PREFIXES = (b'#', b'//')
+
+# 二进制/资源文件扩展名：只做大小检查，不读取内容
+_BINARY_EXTS = frozenset({
+    'png', 'jpg', 'jpeg', 'gif', 'bmp', 'ico', 'webp', 'tif', 'tiff', 'psd',
+    'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx',
+    'zip', 'gz', 'tgz', 'bz2', 'xz', '7z', 'rar', 'tar', 'jar', 'war', 'whl',
+    'exe', 'dll', 'so', 'dylib', 'o', 'a', 'class', 'pyc', 'pyo', 'bin', 'wasm',
+    'woff', 'woff2', 'ttf', 'otf', 'eot',
+    'mp3', 'mp4', 'wav', 'flac', 'ogg', 'mov', 'avi', 'mkv', 'webm',
+    'db', 'sqlite', 'sqlite3',
+})
+
+# 只在这些前端源码中统计 console.log / console.error
+_JS_EXTS = frozenset({'js', 'ts', 'jsx', 'tsx', 'vue', 'mjs', 'cjs'})
+
+# 超过该大小的文件按块流式读取（块在行尾切分），内存占用不随文件大小增长
+_BLOCK_SIZE = 16 * 1024 * 1024
+
+# 行首空白之后至少两个字节（强制切分超长行前检查，保证注释前缀完整落在前一块）
+_LINE_HEAD = re.compile(rb'\s*\S.', re.DOTALL)
+
+# 强制切分时回退到末尾单词之前（最多 64 字节），避免把 TODO 等标记拆到两块
+_WORD_TAIL = re.compile(rb'\w+\Z')
+
+# 分块读取时带入下一块的重叠长度：文档注释从上一块最后一个命中之后续扫（最多 64KB），
+# 密钥保留上一块末尾 64 字节（各密钥模式的命中都短于该长度）
+_DOC_PATTERN_MAX = 64 * 1024
+_SECRET_OVERLAP = 64
+
+
+def _count_line_breaks(data: bytes, start: int, end: int) -> int:
+    """统计 data[start:end] 中的换行数（\n、\r\n、\r 各计一次，与 splitlines 一致）"""
+    return (data.count(b'\n', start, end) + data.count(b'\r', start, end)
+            - data.count(b'\r\n', start, end))
+
+
+def _line_at(data: bytes, pos: int) -> bytes:
+    """取出 pos 所在的整行（不含换行符）"""
+    line_start = max(data.rfind(b'\n', 0, pos), data.rfind(b'\r', 0, pos)) + 1
+    line_end = len(data)
+    for sep in (b'\n', b'\r'):
+        i = data.find(sep, pos, line_end)
+        if i != -1:
+            line_end = i
+    return data[line_start:line_end]
+
+
+def _read_blocks(path: str, ext: str, size: int):
+    """读取文件原始字节，返回按行尾切分的块序列
+
+    空文件不打开，返回 [b'']；二进制文件或打开失败时返回 None。
+    不超过 _BLOCK_SIZE 的文件整体读入作为一块，更大的文件逐块读取。
+    """
+    if not size:
+        return [b'']
+    if ext.lower() in _BINARY_EXTS:
+        return None
+    try:
+        f = open(path, 'rb')
+    except Exception:
+        return None
+    if size <= _BLOCK_SIZE:
+        with f:
+            try:
+                return [f.read()]
+            except Exception:
+                return None
+    return _iter_blocks(f)
+
+
+def _iter_blocks(f):
+    """逐块读取大文件，每块截止到最后一个换行，剩余部分并入下一块
+
+    没有换行的超长行累积到 _BLOCK_SIZE 时强制切分，缓冲区不超过两块大小。
+    """
+    with f:
+        tail = b''
+        while True:
+            try:
+                chunk = f.read(_BLOCK_SIZE)
+            except Exception:
+                break
+            if not chunk:
+                break
+            buf = tail + chunk
+            # 末尾的 \r 可能与下一次读到的 \n 组成 \r\n，留给下一块
+            end = len(buf) - 1 if buf.endswith(b'\r') else len(buf)
+            cut = max(buf.rfind(b'\n', 0, end), buf.rfind(b'\r', 0, end)) + 1
+            head = None if cut or len(buf) < _BLOCK_SIZE else _LINE_HEAD.match(buf)
+            if head:
+                # 超长行强制切分；块内片段已含行首两个非空白字节，注释前缀判断不受切分影响
+                cut = end
+                word = _WORD_TAIL.search(buf, max(end - 64, 0), end)
+                if word and word.start() >= head.end():
+                    cut = word.start()
+            if cut:
+                tail = buf[cut:]
+                yield buf[:cut]
+            else:
+                tail = buf
+        if tail:
+            yield tail
+
+
+def _classify_lines(lines: List[bytes]) -> Tuple[int, int, int]:
+    """一次遍历统计空行、注释行（# // /* *）与单行注释（# //）
+
+    Returns:
+        (空行数, 注释行数, 单行注释数)
+    """
+    blank = 0
+    comment = 0
+    line_comments = 0
+
+    # 前缀判断只需去掉行首空白；单行注释前缀是注释前缀的子集，只在命中注释时再判断
+    for line in lines:
+        stripped = line.lstrip()
+        if not stripped:
+            blank += 1
+        elif stripped.startswith(_COMMENT_PREFIXES):
+            comment += 1
+            if stripped.startswith(_LINE_COMMENT_PREFIXES):
+                line_comments += 1
+
+    return blank, comment, line_comments
+
+
+def _count_go_doc_blocks(lines: List[bytes], in_run: bool = False) -> Tuple[int, bool]:
+    """统计 Go 文档注释：紧接在顶层声明（不缩进的非空行）之前的连续 // 注释块，每块计一次
+
+    Returns:
+        (文档注释块数, 末尾是否处于 // 注释块中)；分块读取时后者传给下一块
+    """
+    count = 0
+
+    for line in lines:
+        stripped = line.lstrip()
+        if stripped.startswith(b'//'):
+            in_run = True
+        elif stripped:
+            # 函数体内缩进的注释不是文档注释
+            if in_run and len(stripped) == len(line):
+                count += 1
+            in_run = False
+        else:
+            # 空行打断注释块，其后的声明不算有文档注释
+            in_run = False
+
+    return count, in_run
 
 
 class QualityAnalyzer:
     """代码质量分析器"""
 
-    def __init__(self, repo_path: str):
+    # 以下正则均为 ASCII 模式，直接在文件原始字节上匹配，无需整体解码
+
+    # 各语言文档注释（类加载时编译一次，优先使用 RE2）
+    DOC_PATTERNS = {
+        'py': compile_linear(rb'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\''),
+        'js': compile_linear(rb'/\*\*[\s\S]*?\*/'),
+        'ts': compile_linear(rb'/\*\*[\s\S]*?\*/'),
+        'java': compile_linear(rb'/\*\*[\s\S]*?\*/'),
+    }
+
+    # 技术债务分类，顺序与 DEBT_PATTERN 中的分组一致（按 lastindex 取分类：
+    # RE2 对 bytes 模式返回的 lastgroup 是 bytes，分组序号则两者一致）
+    DEBT_TYPES = ('todos', 'fixmes', 'deprecated', 'hacks')
+
+    # 技术债务标记合并为一个交替正则，分组名与 tech_debt 结果中的分类一一对应
+    # （可选的 `#`/空白/`@` 前缀不影响是否命中，已省去；优先使用 RE2）
+    DEBT_PATTERN = compile_linear(
+        rb'(?P<todos>TODO(?:[:\s]|$))'
+        rb'|(?P<fixmes>FIXME(?:[:\s]|$))'
+        rb'|(?P<deprecated>deprecated)'
+        rb'|(?P<hacks>HACK(?:[:\s]|$))',
+        re.IGNORECASE,
+    )
+
+    # 硬编码密钥合并为一个交替正则，每个分组对应一类密钥；各分支包在零宽
+    # 先行断言中，彼此重叠的命中（如 token = "AKIA..."）不会互相吞掉（RE2 不支持先行断言，使用 re）。
+    # 开头先用首字母做一次快速筛选，避免在每个位置都逐一尝试五个断言
+    SECRET_PATTERN = re.compile(
+        rb'(?=[past])(?:'
+        rb'(?=(?P<password>password\s*=\s*["\'][^"\']+["\']))'
+        rb'|(?=(?P<api_key>api_key\s*=\s*["\'][^"\']+["\']))'
+        rb'|(?=(?P<secret>secret\s*=\s*["\'][^"\']+["\']))'
+        rb'|(?=(?P<token>token\s*=\s*["\'][^"\']+["\']))'
+        rb'|(?=(?P<aws_access_key>AKIA[0-9A-Z]{16}))'
+        rb')',
+        re.IGNORECASE,
+    )
+
+    def __init__(self, repo_path: str, jobs: int = 1):
         """初始化分析器
 
         Args:
             repo_path: 仓库本地路径
+            jobs: 并行分析的进程数（默认 1 即单进程，0 表示 CPU 核数）
         """
         self.repo_path = Path(repo_path)
         if not self.repo_path.exists():
             raise ValueError(f"仓库路径不存在: {repo_path}")
+        self.jobs = jobs
 
     def analyze(self) -> Dict:
         """执行完整代码质量分析
 
+        只遍历一次目录树、每个文件只读一次，内容依次交给各项分析累计。
+        jobs > 1 时文件列表按顺序切块交给多个进程分析，再按原顺序合并，
+        结果与单进程一致。
+
         Returns:
             质量分析结果
         """
-        return {
-            'code_stats': self._collect_code_stats(),
-            'comments': self._analyze_comments(),
-            'tech_debt': self._find_tech_debt(),
-            'issues': self._detect_issues(),
-        }
-
-    def _collect_code_stats(self) -> Dict:
-        """收集代码统计"""
+        entries = list(self._iter_files())
+        jobs = self.jobs or os.cpu_count() or 1
+        if jobs <= 1 or len(entries) <= jobs:
+            result = self._analyze_files(entries)
+        else:
+            chunk_size = -(-len(entries) // jobs)
+            chunks = [(str(self.repo_path), entries[i:i + chunk_size])
+                      for i in range(0, len(entries), chunk_size)]
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                result = _merge_results(list(executor.map(_analyze_chunk, chunks)))
+
+        result['tech_debt'] = _debt_rows(result['tech_debt'])
+        return result
+
+    def _analyze_files(self, entries: List[Tuple[str, str, str, int]]) -> Dict:
+        """依次分析一组文件，累计各项结果
+
+        技术债务按列累计（每类三个并列列表），由 analyze() 最后再转换为逐条字典。
+        """
         stats = {
             'total_lines': 0,
             'code_lines': 0,
@@ -44,222 +261,232 @@ class QualityAnalyzer:
             'blank_lines': 0,
             'by_language': defaultdict(lambda: {'files': 0, 'lines': 0}),
         }
-
-        exclude_dirs = {'.git', 'node_modules', '__pycache__', 'venv', '.venv', 'dist', 'build', 'target'}
-
-        for file_path in self.repo_path.rglob('*'):
-            if not file_path.is_file():
-                continue
-
-            if any(exc in file_path.parts for exc in exclude_dirs):
-                continue
-
-            ext = file_path.suffix.lstrip('.')
-            if not ext:
-                continue
-
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                    total = len(lines)
-                    blank = sum(1 for line in lines if not line.strip())
-                    comment = 0
-
-                    # 简单注释统计
-                    for line in lines:
-                        stripped = line.strip()
-                        if stripped.startswith('#') or stripped.startswith('//'):
-                            comment += 1
-                        elif stripped.startswith('/*') or stripped.startswith('*'):
-                            comment += 1
-
-                    code = total - blank
-
-                    stats['total_lines'] += total
-                    stats['code_lines'] += code
-                    stats['comment_lines'] += comment
-                    stats['blank_lines'] += blank
-                    stats['by_language'][ext]['files'] += 1
-                    stats['by_language'][ext]['lines'] += code
-
-            except Exception:
-                pass
-
-        # 转换为普通字典
-        stats['by_language'] = dict(stats['by_language'])
-        return stats
-
-    def _analyze_comments(self) -> Dict:
-        """分析注释情况"""
         comment_stats = {
             'total': 0,
             'doc_comments': 0,
             'line_comments': 0,
             'file_coverage': {},  # 文件 -> 是否有文档注释
         }
-
-        exclude_dirs = {'.git', 'node_modules', '__pycache__', 'venv', '.venv'}
-
-        doc_patterns = {
-            'py': r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'',
-            'js': r'/\*\*[\s\S]*?\*/',
-            'ts': r'/\*\*[\s\S]*?\*/',
-            'java': r'/\*\*[\s\S]*?\*/',
-            'go': r'//.*',
+        debt = {
+            debt_type: {'file': [], 'line': [], 'content': []}
+            for debt_type in self.DEBT_TYPES
+        }
+        issues = {
+            'hardcoded_secrets': [],
+            'console_logs': [],
+            'empty_files': [],
+            'large_files': [],
         }
 
-        for file_path in self.repo_path.rglob('*'):
-            if not file_path.is_file():
-                continue
+        for rel_path, path, ext, size in entries:
+            self._check_file_size(issues, rel_path, size)
 
-            if any(exc in file_path.parts for exc in exclude_dirs):
+            blocks = _read_blocks(path, ext, size)
+            if blocks is None:
                 continue
 
-            ext = file_path.suffix.lstrip('.')
-
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-
-                    line_comments = sum(1 for line in lines if line.strip().startswith(('#', '//')))
-                    doc_comments = 0
-
-                    if ext in doc_patterns:
-                        doc_comments = len(re.findall(doc_patterns[ext], content))
-
-                    comment_stats['total'] += line_comments + doc_comments
-                    comment_stats['line_comments'] += line_comments
-                    comment_stats['doc_comments'] += doc_comments
-
-                    rel_path = str(file_path.relative_to(self.repo_path))
-                    comment_stats['file_coverage'][rel_path] = {
-                        'has_docs': doc_comments > 0,
-                        'comments': line_comments + doc_comments,
-                    }
-
-            except Exception:
-                pass
-
-        return comment_stats
+            # 大文件分多块处理：块在行尾切分，行内的统计与块无关；跨块的文档注释与密钥
+            # 由 carry 带入有限长度的重叠部分续扫。超长行强制切分时行数仍按整行计，
+            # 但被切开的技术债务标记、console 调用可能漏计，只影响超过 _BLOCK_SIZE 的文件
+            carry = None if isinstance(blocks, list) else {}
+            line_base = 0
+            continued = False
+            for i, data in enumerate(blocks):
+                # bytes.splitlines 按 \n、\r\n、\r 断行，与文本模式的通用换行一致
+                lines = data.splitlines()
+                counted = lines
+                if continued:
+                    # 上一块在超长行中间强制切分：本块首行是该行的后半段，不再单独计行
+                    line_base -= 1
+                    counted = lines[1:]
+                blank, comment, line_comments = _classify_lines(counted)
+
+                self._detect_issues(issues, rel_path, ext, data, carry)
+                self._collect_code_stats(stats, ext, len(counted), blank, comment, i == 0)
+                self._analyze_comments(comment_stats, rel_path, ext, data, counted, line_comments, carry)
+                self._find_tech_debt(debt, rel_path, data, line_base)
+                line_base += len(lines)
+                continued = not data.endswith((b'\n', b'\r'))
 
-    def _find_tech_debt(self) -> Dict:
-        """查找技术债务"""
-        debt = {
-            'todos': [],
-            'fixmes': [],
-            'deprecated': [],
-            'hacks': [],
-        }
+        # 转换为普通字典
+        stats['by_language'] = dict(stats['by_language'])
 
-        patterns = {
-            'todo': r'#?\s*TODO[:\s]',
-            'fixme': r'#?\s*FIXME[:\s]',
-            'deprecated': r'@deprecated|deprecated',
-            'hack': r'#?\s*HACK[:\s]',
+        return {
+            'code_stats': stats,
+            'comments': comment_stats,
+            'tech_debt': debt,
+            'issues': issues,
         }
 
-        exclude_dirs = {'.git', 'node_modules', '__pycache__', 'venv', '.venv'}
+    def _iter_files(self):
+        """遍历仓库文件
 
-        for file_path in self.repo_path.rglob('*'):
-            if not file_path.is_file():
-                continue
+        Yields:
+            (相对路径, 完整路径, 扩展名, 文件大小)
+        """
+        root = str(self.repo_path)
+        prefix_len = len(os.path.join(root, ''))
 
-            if any(exc in file_path.parts for exc in exclude_dirs):
+        for entry in scandir_recursive(root):
+            try:
+                size = entry.stat().st_size
+            except OSError:
                 continue
 
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    for i, line in enumerate(f, 1):
-                        for debt_type, pattern in patterns.items():
-                            if re.search(pattern, line, re.IGNORECASE):
-                                rel_path = str(file_path.relative_to(self.repo_path))
-                                debt[debt_type].append({
-                                    'file': rel_path,
-                                    'line': i,
-                                    'content': line.strip()[:100],
-                                })
+            ext = os.path.splitext(entry.name)[1][1:]
+            yield entry.path[prefix_len:], entry.path, ext, size
 
-            except Exception:
-                pass
+    def _collect_code_stats(self, stats: Dict, ext: str, total: int, blank: int, comment: int,
+                            new_file: bool = True):
+        """累计单个文件（或大文件的一块）的代码统计"""
+        if not ext:
+            return
 
-        return debt
+        code = total - blank
 
-    def _detect_issues(self) -> Dict:
-        """检测潜在问题"""
-        issues = {
-            'hardcoded_secrets': [],
-            'console_logs': [],
-            'empty_files': [],
-            'large_files': [],
-        }
+        stats['total_lines'] += total
+        stats['code_lines'] += code
+        stats['comment_lines'] += comment
+        stats['blank_lines'] += blank
+        if new_file:
+            stats['by_language'][ext]['files'] += 1
+        stats['by_language'][ext]['lines'] += code
 
-        exclude_dirs = {'.git', 'node_modules', '__pycache__', 'venv', '.venv'}
+    def _analyze_comments(self, comment_stats: Dict, rel_path: str, ext: str,
+                          data: bytes, lines: List[bytes], line_comments: int,
+                          carry: Dict = None):
+        """累计单个文件（或大文件的一块）的注释情况
 
-        secret_patterns = [
-            r'password\s*=\s*["\'][^"\']+["\']',
-            r'api_key\s*=\s*["\'][^"\']+["\']',
-            r'secret\s*=\s*["\'][^"\']+["\']',
-            r'token\s*=\s*["\'][^"\']+["\']',
-            r'AKIA[0-9A-Z]{16}',  # AWS Access Key
-        ]
+        carry 为分块读取时跨块保存的状态（整体读入的文件为 None）。
+        """
+        doc_comments = 0
+
+        doc_pattern = self.DOC_PATTERNS.get(ext)
+        if doc_pattern is not None and carry is None:
+            doc_comments = len(doc_pattern.findall(data))
+        elif doc_pattern is not None:
+            # 从上一块最后一个命中之后续扫，跨块的文档注释只计一次
+            prefix = carry.get('doc', b'')
+            buf = prefix + data if prefix else data
+            last_end = 0
+            for m in doc_pattern.finditer(buf):
+                doc_comments += 1
+                last_end = m.end()
+            carry['doc'] = buf[max(last_end, len(buf) - _DOC_PATTERN_MAX):]
+        elif ext == 'go':
+            in_run = carry.get('go_run', False) if carry is not None else False
+            doc_comments, in_run = _count_go_doc_blocks(lines, in_run)
+            if carry is not None:
+                carry['go_run'] = in_run
+
+        comment_stats['total'] += line_comments + doc_comments
+        comment_stats['line_comments'] += line_comments
+        comment_stats['doc_comments'] += doc_comments
+
+        coverage = comment_stats['file_coverage'].setdefault(
+            rel_path, {'has_docs': False, 'comments': 0})
+        coverage['has_docs'] = coverage['has_docs'] or doc_comments > 0
+        coverage['comments'] += line_comments + doc_comments
+
+    def _find_tech_debt(self, debt: Dict, rel_path: str, data: bytes, line_base: int = 0):
+        """查找单个文件（或大文件的一块）中的技术债务标记
+
+        整个文件只做一次 finditer；行号从上一个命中位置起增量统计换行得到。
+        line_base 为该块之前已有的行数。
+        """
+        line_no = line_base + 1
+        last_pos = 0
+        seen = set()  # (行号, 分类)：同一行内每类标记只记一次
 
-        for file_path in self.repo_path.rglob('*'):
-            if not file_path.is_file():
-                continue
+        for m in self.DEBT_PATTERN.finditer(data):
+            pos = m.start()
+            line_no += _count_line_breaks(data, last_pos, pos)
+            last_pos = pos
 
-            if any(exc in file_path.parts for exc in exclude_dirs):
+            debt_type = self.DEBT_TYPES[m.lastindex - 1]
+            if (line_no, debt_type) in seen:
                 continue
-
-            # 检查文件大小
-            try:
-                size = file_path.stat().st_size
-                if size > 100_000:  # > 100KB
-                    rel_path = str(file_path.relative_to(self.repo_path))
-                    issues['large_files'].append({
+            seen.add((line_no, debt_type))
+
+            columns = debt[debt_type]
+            columns['file'].append(rel_path)
+            columns['line'].append(line_no)
+            columns['content'].append(
+                _line_at(data, pos).decode('utf-8', errors='ignore').strip()[:100])
+
+    def _check_file_size(self, issues: Dict, rel_path: str, size: int):
+        """检查单个文件的大小（包括不读取内容的二进制文件）"""
+        # 检查文件大小
+        if size > 100_000:  # > 100KB
+            issues['large_files'].append({
+                'file': rel_path,
+                'size_kb': round(size / 1024, 1),
+            })
+
+        # 检查文件是否为空
+        if size == 0:
+            issues['empty_files'].append(rel_path)
+
+    def _detect_issues(self, issues: Dict, rel_path: str, ext: str, data: bytes,
+                       carry: Dict = None):
+        """检测单个文件（或大文件的一块）内容中的潜在问题
+
+        同一文件的多块结果合并到该文件已有的条目中；carry 同 _analyze_comments。
+        """
+        # 检查硬编码密钥
+        # 一次扫描，每个文件只记一条，附各类密钥的命中次数
+        if carry is None:
+            hits = Counter(m.lastgroup for m in self.SECRET_PATTERN.finditer(data))
+        else:
+            hits = self._count_secrets_across_blocks(data, carry)
+        if hits:
+            secrets = issues['hardcoded_secrets']
+            if secrets and secrets[-1]['file'] == rel_path:
+                counts = secrets[-1]['counts']
+                for name, n in hits.items():
+                    counts[name] = counts.get(name, 0) + n
+            else:
+                secrets.append({
+                    'file': rel_path,
+                    'type': 'potential_secret',
+                    'counts': dict(hits),
+                })
+
+        # 检查 console.log（仅前端源码）
+        # 先定位公共前缀 console.，多数文件一次扫描即可结束；命中时只从该位置起计数
+        if ext in _JS_EXTS:
+            start = data.find(b'console.')
+            if start != -1:
+                count = data.count(b'console.log', start) + data.count(b'console.error', start)
+                logs = issues['console_logs']
+                if count and logs and logs[-1]['file'] == rel_path:
+                    logs[-1]['count'] += count
+                elif count:
+                    logs.append({
                         'file': rel_path,
-                        'size_kb': round(size / 1024, 1),
+                        'count': count,
                     })
-            except Exception:
-                pass
-
-            # 检查文件是否为空
-            try:
-                if file_path.stat().st_size == 0:
-                    rel_path = str(file_path.relative_to(self.repo_path))
-                    issues['empty_files'].append(rel_path)
-            except Exception:
-                pass
-
-            # 检查敏感信息和日志
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                    # 检查硬编码密钥
-                    for pattern in secret_patterns:
-                        matches = re.finditer(pattern, content, re.IGNORECASE)
-                        for match in matches:
-                            rel_path = str(file_path.relative_to(self.repo_path))
-                            issues['hardcoded_secrets'].append({
-                                'file': rel_path,
-                                'type': 'potential_secret',
-                            })
-                            break
-
-                    # 检查 console.log
-                    if 'console.log' in content or 'console.error' in content:
-                        rel_path = str(file_path.relative_to(self.repo_path))
-                        count = content.count('console.log') + content.count('console.error')
-                        issues['console_logs'].append({
-                            'file': rel_path,
-                            'count': count,
-                        })
-
-            except Exception:
-                pass
 
-        return issues
+    def _count_secrets_across_blocks(self, data: bytes, carry: Dict) -> Counter:
+        """带上一块末尾 _SECRET_OVERLAP 字节扫描密钥，重叠部分中上一块已计的命中不重复计"""
+        prefix = carry.get('secret', b'')
+        seen = carry.get('secret_seen', ())
+        buf = prefix + data
+        tail_start = len(buf) - _SECRET_OVERLAP
+
+        hits = Counter()
+        found = set()  # 本块末尾重叠区内的命中，位置相对 buf 末尾
+        for m in self.SECRET_PATTERN.finditer(buf):
+            pos = m.start()
+            if pos >= len(prefix) or pos - len(prefix) not in seen:
+                hits[m.lastgroup] += 1
+            # 已计过的命中仍要记下：块短于重叠长度时它还会出现在下一块的重叠区
+            if pos >= tail_start:
+                found.add(pos - len(buf))
+
+        carry['secret'] = buf[-_SECRET_OVERLAP:]
+        carry['secret_seen'] = found
+        return hits
 
     def generate_report(self) -> str:
         """生成质量分析报告"""
@@ -285,7 +512,7 @@ class QualityAnalyzer:
         # 按语言统计
         if stats['by_language']:
             lines.append("\n### 按语言统计")
-            for lang, data in sorted(stats['by_language'].items(), key=lambda x: x[1]['lines'], reverse=True)[:5]:
+            for lang, data in heapq.nlargest(5, stats['by_language'].items(), key=lambda x: x[1]['lines']):
                 lines.append(f"- **{lang}**: {data['files']} 文件, {data['lines']:,} 行代码")
 
         # 技术债务
@@ -309,9 +536,10 @@ class QualityAnalyzer:
             lines.append("\n## 问题检测")
 
             if issues['hardcoded_secrets']:
-                lines.append(f"\n### ⚠️ 硬编码密钥 ({len(issues['hardcoded_secrets'])} 个)")
+                lines.append(f"\n### ⚠️ 硬编码密钥 ({len(issues['hardcoded_secrets'])} 个文件)")
                 for item in issues['hardcoded_secrets'][:3]:
-                    lines.append(f"- `{item['file']}` - 检测到可能的密钥")
+                    counts = ', '.join(f"{name} {n} 处" for name, n in item['counts'].items())
+                    lines.append(f"- `{item['file']}` - 检测到可能的密钥（{counts}）")
 
             if issues['console_logs']:
                 lines.append(f"\n### Console 日志 ({len(issues['console_logs'])} 个文件)")
@@ -326,16 +554,61 @@ class QualityAnalyzer:
         return '\n'.join(lines)
 
 
+def _analyze_chunk(args: Tuple[str, List[Tuple[str, str, str, int]]]) -> Dict:
+    """子进程入口：分析一块文件，返回部分结果"""
+    repo_path, entries = args
+    return QualityAnalyzer(repo_path)._analyze_files(entries)
+
+
+def _merge_results(parts: List[Dict]) -> Dict:
+    """按顺序合并各子进程的部分结果"""
+    result = parts[0]
+    stats = result['code_stats']
+    comment_stats = result['comments']
+
+    for part in parts[1:]:
+        for key in ('total_lines', 'code_lines', 'comment_lines', 'blank_lines'):
+            stats[key] += part['code_stats'][key]
+        for ext, data in part['code_stats']['by_language'].items():
+            lang = stats['by_language'].setdefault(ext, {'files': 0, 'lines': 0})
+            lang['files'] += data['files']
+            lang['lines'] += data['lines']
+
+        for key in ('total', 'doc_comments', 'line_comments'):
+            comment_stats[key] += part['comments'][key]
+        comment_stats['file_coverage'].update(part['comments']['file_coverage'])
+
+        for key, columns in part['tech_debt'].items():
+            for column, values in columns.items():
+                result['tech_debt'][key][column].extend(values)
+        for key, items in part['issues'].items():
+            result['issues'][key].extend(items)
+
+    return result
+
+
+def _debt_rows(debt: Dict) -> Dict:
+    """把按列累计的技术债务转换为逐条字典列表"""
+    return {
+        debt_type: [
+            {'file': f, 'line': line, 'content': content}
+            for f, line, content in zip(columns['file'], columns['line'], columns['content'])
+        ]
+        for debt_type, columns in debt.items()
+    }
+
+
 def main():
     """测试入口"""
     import sys
 
     if len(sys.argv) < 2:
-        print("用法: python -m analyzer.quality <仓库路径>")
+        print("用法: python -m analyzer.quality <仓库路径> [并行进程数]")
         sys.exit(1)
 
     repo_path = sys.argv[1]
-    analyzer = QualityAnalyzer(repo_path)
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    analyzer = QualityAnalyzer(repo_path, jobs)
     print(analyzer.generate_report())
 
 
@@ -8,11 +8,24 @@ repo-research 语义搜索模块
 import argparse
 import os
 import subprocess
+import threading
 import json
 import re
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
+# 目录遍历与正则编译的公共实现
+try:
+    from .common import EXCLUDE_DIRS, compile_linear, scandir_recursive
+except ImportError:
+    # 直接运行脚本时
+    from common import EXCLUDE_DIRS, compile_linear, scandir_recursive
+
+# 参与搜索的代码文件扩展名
+CODE_EXTENSIONS = frozenset({'.py', '.js', '.jsx', '.ts', '.tsx', '.go', '.rs', '.java'})
+
+# 单次 rg/grep 搜索的超时（秒）
+SEARCH_TIMEOUT = 10
 
 class CodeSearcher:
     """代码语义搜索器"""
@@ -69,6 +82,12 @@ class CodeSearcher:
         },
     }
 
+    # 各模式的正则（按 re.MULTILINE）在类加载时编译一次，优先使用 RE2
+    SEARCH_REGEXES = {
+        file_type: {mode: compile_linear(pattern, re.MULTILINE) for mode, pattern in patterns.items()}
+        for file_type, patterns in SEARCH_PATTERNS.items()
+    }
+
     def __init__(self, repo_path: str):
         """初始化搜索器
 
@@ -79,6 +98,10 @@ class CodeSearcher:
         if not self.repo_path.exists():
             raise ValueError(f"仓库路径不存在: {repo_path}")
 
+        # 代码文件列表缓存：[(文件路径, 文件类型)]，及对应的仓库根目录 mtime
+        self._file_cache: Optional[List[Tuple[str, str]]] = None
+        self._cache_mtime: Optional[int] = None
+
     def get_file_type(self, file_path: str) -> Optional[str]:
         """根据文件扩展名获取文件类型"""
         ext = Path(file_path).suffix.lstrip('.')
@@ -105,100 +128,151 @@ class CodeSearcher:
         Returns:
             搜索结果列表
         """
-        results = []
-
-        # 获取仓库中的代码文件
-        code_extensions = {'.py', '.js', '.jsx', '.ts', '.tsx', '.go', '.rs', '.java'}
-        code_files = []
+        if mode == 'pattern':
+            # 普通模式搜索 - 交给 rg/grep 一次搜索整个仓库
+            return self._grep_search(pattern, max_results)
 
-        for ext in code_extensions:
-            code_files.extend(self.repo_path.rglob(f'*{ext}'))
+        # 语义模式搜索
+        return self._semantic_search(pattern, mode, self._get_code_files(), max_results)
 
-        # 排除 node_modules, __pycache__, .git 等
-        exclude_dirs = {'node_modules', '__pycache__', '.git', 'venv', '.venv', 'dist', 'build', 'target'}
+    def _get_code_files(self) -> List[Tuple[str, str]]:
+        """获取仓库中的代码文件及其类型
 
-        code_files = [f for f in code_files if not any(exc in f.parts for exc in exclude_dirs)]
+        一次遍历得到的列表缓存在实例上，重复搜索直接复用；仓库根目录 mtime
+        变化（根目录下增删条目）时重新遍历。
+        """
+        mtime = os.stat(self.repo_path).st_mtime_ns
+        if self._file_cache is None or mtime != self._cache_mtime:
+            code_files = []
+            for entry in scandir_recursive(str(self.repo_path)):
+                ext = os.path.splitext(entry.name)[1]
+                if ext in CODE_EXTENSIONS:
+                    code_files.append((entry.path, self.get_file_type(entry.name)))
+            self._file_cache = code_files
+            self._cache_mtime = mtime
+        return self._file_cache
+
+    def _grep_search(self, pattern: str, max_results: int) -> List[Dict]:
+        """使用 ripgrep 进行模式搜索，rg 不可用时退回 grep
+
+        整个仓库只启动一次搜索进程，由其自行遍历目录；逐行读取输出，
+        结果数达到上限即终止进程。
+        """
+        try:
+            return self._run_search_process(self._rg_command(pattern), self._parse_rg_line, max_results)
+        except FileNotFoundError:
+            pass
+
+        try:
+            return self._run_search_process(self._grep_command(pattern), self._parse_grep_line, max_results)
+        except Exception:
+            return []
+
+    def _rg_command(self, pattern: str) -> List[str]:
+        """构建 ripgrep 命令：只搜代码文件，跳过排除目录"""
+        # 与遍历代码文件时的范围一致：不读取 .gitignore，包含隐藏文件
+        cmd = ['rg', '--json', '--no-ignore', '--hidden', '-e', pattern]
+        for ext in sorted(CODE_EXTENSIONS):
+            cmd += ['-g', f'*{ext}']
+        for name in sorted(EXCLUDE_DIRS):
+            cmd += ['-g', f'!{name}']
+        cmd.append(str(self.repo_path))
+        return cmd
+
+    def _grep_command(self, pattern: str) -> List[str]:
+        """构建 grep 命令：只搜代码文件，跳过排除目录"""
+        # --null：文件名后输出 \0 而非 ':'，文件名中含 ':' 时也能正确拆分
+        cmd = ['grep', '-rn', '--null', '-e', pattern]
+        cmd += [f'--include=*{ext}' for ext in sorted(CODE_EXTENSIONS)]
+        cmd += [f'--exclude-dir={name}' for name in sorted(EXCLUDE_DIRS)]
+        cmd.append(str(self.repo_path))
+        return cmd
+
+    @staticmethod
+    def _parse_rg_line(line: str) -> Optional[Dict]:
+        """解析 rg --json 的一行输出，只保留 match 记录"""
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if data.get('type') != 'match':
+            return None
+        match = data['data']
+        return {
+            'file': match.get('path', {}).get('text', ''),
+            'line': match.get('line_number', 0),
+            'content': match.get('lines', {}).get('text', '').strip(),
+        }
 
-        if mode == 'pattern':
-            # 普通模式搜索 - 使用 grep
-            results = self._grep_search(pattern, code_files, max_results)
-        else:
-            # 语义模式搜索
-            results = self._semantic_search(pattern, mode, code_files, max_results)
+    @staticmethod
+    def _parse_grep_line(line: str) -> Optional[Dict]:
+        """解析 grep -rn --null 的一行输出（文件\0行号:内容）"""
+        file_path, sep, rest = line.partition('\0')
+        line_num, colon, content = rest.partition(':')
+        if not sep or not colon:
+            return None
+        try:
+            line_num = int(line_num)
+        except ValueError:
+            return None
+        return {
+            'file': file_path,
+            'line': line_num,
+            'content': content.strip(),
+        }
 
-        return results
+    @staticmethod
+    def _run_search_process(cmd: List[str], parse_line, max_results: int) -> List[Dict]:
+        """启动搜索进程并流式解析输出，达到结果上限或超时即终止进程
 
-    def _grep_search(self, pattern: str, files: List[Path], max_results: int) -> List[Dict]:
-        """使用 grep 进行模式搜索"""
+        超时后返回已读到的结果。
+        """
         results = []
-
-        for file_path in files[:100]:  # 限制文件数量
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              text=True, encoding='utf-8', errors='replace') as proc:
+            # 读取输出会阻塞，由定时器在超时后终止进程，读取随之结束
+            timer = threading.Timer(SEARCH_TIMEOUT, proc.kill)
+            timer.start()
             try:
-                # 使用 ripgrep 或 grep
-                cmd = ['rg', '-n', '--no-heading', '-e', pattern, str(file_path), '--json']
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-
-                if result.returncode == 0:
-                    for line in result.stdout.strip().split('\n'):
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                if 'data' in data:
-                                    match = data['data']
-                                    results.append({
-                                        'file': str(match.get('path', {}).get('text', file_path)),
-                                        'line': match.get('line_number', 0),
-                                        'content': match.get('lines', {}).get('text', '').strip(),
-                                    })
-                            except json.JSONDecodeError:
-                                pass
-            except Exception as e:
-                # 如果 rg 不可用，尝试使用 grep
-                try:
-                    cmd = ['grep', '-rn', pattern, str(file_path)]
-                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-                    if result.returncode == 0:
-                        for line in result.stdout.strip().split('\n'):
-                            if ':' in line:
-                                parts = line.split(':', 2)
-                                if len(parts) >= 3:
-                                    results.append({
-                                        'file': parts[0],
-                                        'line': parts[1],
-                                        'content': parts[2].strip(),
-                                    })
-                except Exception:
-                    pass
-
-            if len(results) >= max_results:
-                break
-
-        return results[:max_results]
+                for line in proc.stdout:
+                    result = parse_line(line)
+                    if result is None:
+                        continue
+                    results.append(result)
+                    if len(results) >= max_results:
+                        proc.kill()
+                        break
+            finally:
+                timer.cancel()
+        return results
 
-    def _semantic_search(self, pattern: str, mode: str, files: List[Path], max_results: int) -> List[Dict]:
+    def _semantic_search(self, pattern: str, mode: str, files: List[Tuple[str, str]],
+                         max_results: int) -> List[Dict]:
         """语义搜索 - 根据模式类型搜索"""
         results = []
 
-        for file_path in files:
-            file_type = self.get_file_type(str(file_path))
-            if not file_type:
-                continue
-
-            patterns = self.SEARCH_PATTERNS.get(file_type, {})
-            regex_pattern = patterns.get(mode, patterns.get('function'))
+        for file_path, file_type in files:
+            regexes = self.SEARCH_REGEXES.get(file_type, {})
+            regex = regexes.get(mode, regexes.get('function'))
 
-            if not regex_pattern:
+            if regex is None:
                 continue
 
             try:
                 with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                     content = f.read()
-                    matches = re.finditer(regex_pattern, content, re.MULTILINE)
+                    matches = regex.finditer(content)
+
+                    # 命中按位置递增，行号从上一个命中位置起增量统计换行，不再切片复制前缀
+                    line_num = 1
+                    last_pos = 0
 
                     for match in matches:
-                        line_num = content[:match.start()].count('\n') + 1
-                        line_start = content.rfind('\n', 0, match.start()) + 1
-                        line_end = content.find('\n', match.start())
+                        pos = match.start()
+                        line_num += content.count('\n', last_pos, pos)
+                        last_pos = pos
+                        line_start = content.rfind('\n', 0, pos) + 1
+                        line_end = content.find('\n', pos)
                         if line_end == -1:
                             line_end = len(content)
                         line_content = content[line_start:line_end].strip()